@@ -9,31 +9,95 @@ Usage:
 
 from __future__ import annotations
 
-import argparse
 import asyncio
+import bisect
 import datetime
+import functools
+import heapq
+import importlib.util
 import json
+import mmap
+import operator
 import os
 import re
 import sys
+import tempfile
 import time
 import uuid
 from pathlib import Path
-from typing import Any
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
-from dateutil.relativedelta import relativedelta
+if TYPE_CHECKING:
+    import httpx
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to stdlib json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional: sync responses are buffered instead of streamed
+    ijson = None
 
 sys.stdout.reconfigure(encoding="utf-8")
 
 ROOT = Path(__file__).resolve().parent.parent
 
+
+# ---------------------------------------------------------------------------
+# JSON helpers (orjson when installed, stdlib otherwise)
+# ---------------------------------------------------------------------------
+
+def _loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize a tool result to a JSON str, keeping non-ASCII text as-is."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None)
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# path -> ((st_mtime_ns, st_size), parsed JSON)
+_json_file_cache: dict[Path, tuple[tuple[int, int], Any]] = {}
+
+
+def _load_json_file(path: Path) -> Any:
+    """Parse a JSON file, reusing the last parse while its mtime and size are unchanged.
+
+    The result is shared between callers; copy it before mutating.
+    """
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _json_file_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    data = _loads(path.read_bytes())
+    _json_file_cache[path] = (stamp, data)
+    return data
+
+
 # ---------------------------------------------------------------------------
 # Config: load token from config.json or env
 # ---------------------------------------------------------------------------
 _cfg_path = ROOT / "config.json"
 if _cfg_path.exists():
     try:
-        _cfg = json.loads(_cfg_path.read_text(encoding="utf-8"))
+        _cfg = _load_json_file(_cfg_path)
         if _cfg.get("token") and not os.environ.get("ZENMONEY_TOKEN"):
             os.environ["ZENMONEY_TOKEN"] = _cfg["token"]
     except Exception:
@@ -42,27 +106,52 @@ if _cfg_path.exists():
 TOKEN = os.environ.get("ZENMONEY_TOKEN", "")
 BASE_URL = "https://api.zenmoney.ru"
 CACHE_PATH = ROOT / ".cache.json"
+# Touched after every sync; read-only calls skip the sync while it is younger
+# than ZENMONEY_SYNC_TTL seconds (0, the default, always syncs)
+SYNC_STAMP_PATH = ROOT / ".cache.synced"
+try:
+    SYNC_TTL = float(os.environ.get("ZENMONEY_SYNC_TTL") or 0)
+except ValueError:
+    SYNC_TTL = 0.0
 
 # ---------------------------------------------------------------------------
 # Validation helpers
 # ---------------------------------------------------------------------------
-_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
-_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
 
 
 def _validate_uuid(val: str, field: str) -> None:
-    if not _UUID_RE.match(val):
+    if not _UUID_RE.fullmatch(val):
         raise ValueError(f"Invalid UUID for {field}: {val}")
 
 
+def _validate_uuid_list(vals: list, field: str) -> None:
+    """_validate_uuid over a list; field may hold a {} placeholder for the index."""
+    fullmatch = _UUID_RE.fullmatch
+    if all(fullmatch(v) for v in vals):
+        return
+    for i, v in enumerate(vals):
+        _validate_uuid(v, field.format(i))
+
+
+def _is_iso_date(val: str) -> bool:
+    # shape check first: fromisoformat also accepts other ISO forms on 3.11+
+    if len(val) != 10 or val[4] != "-" or val[7] != "-":
+        return False
+    try:
+        datetime.date.fromisoformat(val)
+    except ValueError:
+        return False
+    return True
+
+
 def _validate_date(val: str, field: str) -> None:
-    if not _DATE_RE.match(val):
+    if not _is_iso_date(val):
         raise ValueError(f"Invalid date for {field}: {val}. Expected yyyy-MM-dd")
 
 
 def _validate_month(val: str, field: str) -> None:
-    if not _MONTH_RE.match(val):
+    if len(val) != 7 or not _is_iso_date(f"{val}-01"):
         raise ValueError(f"Invalid month for {field}: {val}. Expected yyyy-MM")
 
 
@@ -80,7 +169,13 @@ def _now_ts() -> int:
 
 
 def _new_uuid() -> str:
-    return str(uuid.uuid4())
+    return str(uuid.UUID(bytes=os.urandom(16), version=4))
+
+
+def _new_uuid_batch(n: int) -> list[str]:
+    """n random UUID4 strings from a single os.urandom() read."""
+    raw = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
 
 
 def _generate_marker_dates(
@@ -113,6 +208,10 @@ def _generate_marker_dates(
     if current < today:
         current = today
 
+    if interval in ("month", "year"):
+        # only calendar-month steps need dateutil; keep it off the import path
+        from dateutil.relativedelta import relativedelta
+
     dates = []
 
     while len(dates) < count:
@@ -166,6 +265,17 @@ _ENTITY_KEYS = [
 ]
 # Keys whose entities have numeric ids
 _NUMERIC_ID_KEYS = {"instrument", "user", "country", "company"}
+# Shared str() of small numeric ids (instruments, countries), looked up instead of re-formatted
+_INT_STR = {i: str(i) for i in range(1024)}
+
+
+def _id_str(eid: Any) -> str:
+    """Store key for an entity id; ids arrive as str (UUIDs) or int (numeric keys)."""
+    if type(eid) is str:
+        return eid
+    if type(eid) is int:
+        return _INT_STR.get(eid) or str(eid)
+    return str(eid)
 
 
 class Cache:
@@ -176,6 +286,18 @@ class Cache:
         # entity_name -> {id_str: entity_dict}
         self.data: dict[str, dict[str, Any]] = {k: {} for k in _ENTITY_KEYS}
         self.data["deletion"] = {}
+        # lookups derived from self.data, built lazily and reset on every change
+        self._derived: dict[str, Any] = {}
+        # set by apply_diff when something changed; save() is a no-op otherwise
+        self._dirty = False
+        # fsync the cache file before replacing it (--durable)
+        self.durable = False
+
+    def _memo(self, name: str, build: Any) -> Any:
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived[name] = build()
+        return value
 
     # -- persistence --------------------------------------------------------
 
@@ -183,88 +305,163 @@ class Cache:
         if not CACHE_PATH.exists():
             return
         try:
-            raw = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+            raw = self._read_file()
         except Exception:
             return
         self.server_timestamp = raw.get("serverTimestamp", 0)
+        keyed = self._keyed
         for key in _ENTITY_KEYS:
-            arr = raw.get(key, [])
-            store: dict[str, Any] = {}
-            for item in arr:
-                if key == "budget":
-                    bk = self._budget_key(item)
-                    store[bk] = item
-                else:
-                    store[str(item.get("id", ""))] = item
-            self.data[key] = store
+            self.data[key] = dict(keyed(key, raw.get(key, [])))
+        self._derived.clear()
+
+    @staticmethod
+    def _read_file() -> Any:
+        """Parse .cache.json; orjson reads it straight from an mmap (no Python-side copy)."""
+        if orjson is None or os.name == "nt":
+            return _loads(CACHE_PATH.read_bytes())
+        with open(CACHE_PATH, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
 
     def save(self) -> None:
+        if not self._dirty:
+            return
+        self._write(self._snapshot())
+        self._dirty = False
+
+    async def save_async(self) -> None:
+        """save() with encoding and file I/O in a worker thread, off the event loop."""
+        if not self._dirty:
+            return
+        # snapshot on the loop thread so apply_diff can't change the stores mid-encode
+        out = self._snapshot()
+        self._dirty = False
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, out)
+        except BaseException:
+            self._dirty = True
+            raise
+
+    def _snapshot(self) -> dict[str, Any]:
         out: dict[str, Any] = {"serverTimestamp": self.server_timestamp}
         for key in _ENTITY_KEYS:
             out[key] = list(self.data[key].values())
-        CACHE_PATH.write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
+        return out
+
+    def _write(self, out: dict[str, Any]) -> None:
+        # write to a temp file and swap it in, so a crash never leaves a torn cache;
+        # the name is unique per write, so concurrent CLI calls never share one
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_PATH.parent, prefix=".cache.", suffix=".json.tmp")
+        try:
+            with open(fd, "wb") as f:
+                f.write(_dumps_bytes(out))
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, CACHE_PATH)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
 
     # -- apply diff ---------------------------------------------------------
 
+    def checkpoint(self) -> tuple[int, bool, dict[str, dict]]:
+        """State to hand back to rollback() if a partly applied diff fails.
+
+        Store dicts are copied shallowly: apply_diff replaces entities rather
+        than mutating them, so the copies keep the pre-diff objects.
+        """
+        return self.server_timestamp, self._dirty, {key: dict(self.data[key]) for key in _ENTITY_KEYS}
+
+    def rollback(self, state: tuple[int, bool, dict[str, dict]]) -> None:
+        self.server_timestamp, self._dirty, stores = state
+        self.data.update(stores)
+        self._derived.clear()
+
     def apply_diff(self, diff: dict[str, Any]) -> None:
-        if "serverTimestamp" in diff:
+        self._derived.clear()
+        if "serverTimestamp" in diff and diff["serverTimestamp"] != self.server_timestamp:
             self.server_timestamp = diff["serverTimestamp"]
+            self._dirty = True
+        keyed = self._keyed
         for key in _ENTITY_KEYS:
             items = diff.get(key)
             if not items:
                 continue
-            for item in items:
-                if key == "budget":
-                    bk = self._budget_key(item)
-                    self.data[key][bk] = item
-                else:
-                    self.data[key][str(item.get("id", ""))] = item
+            self.data[key].update(keyed(key, items))
+            self._dirty = True
         # deletions
-        for d in diff.get("deletion", []):
-            obj_type = d.get("object", "")
-            did = str(d.get("id", ""))
-            if obj_type in self.data and did in self.data[obj_type]:
-                del self.data[obj_type][did]
+        deletions = diff.get("deletion", [])
+        if deletions:
+            self._dirty = True
+        for d in deletions:
+            store = self.data.get(d.get("object", ""))
+            if store is not None:
+                store.pop(_id_str(d.get("id", "")), None)
 
     @staticmethod
     def _budget_key(b: dict) -> str:
         tag = b.get("tag")
         return f"{'null' if tag is None else tag}:{b.get('date', '')}"
 
+    @staticmethod
+    def _budget_key_for(category_id: str, month_date: str) -> str:
+        """_budget_key() of a category id or ALL's zero id, without a budget dict."""
+        if category_id == "00000000-0000-0000-0000-000000000000":
+            return "null:" + month_date
+        return category_id + ":" + month_date
+
+    @classmethod
+    def _keyed(cls, key: str, items: list[dict]) -> Iterator[tuple[str, dict]]:
+        """Yield (store_key, item) pairs for one entity list, for bulk dict updates."""
+        if key == "budget":
+            budget_key = cls._budget_key
+            return ((budget_key(item), item) for item in items)
+        if key in _NUMERIC_ID_KEYS:
+            return ((_id_str(item.get("id", "")), item) for item in items)
+        return ((str(item.get("id", "")), item) for item in items)
+
     # -- helpers ------------------------------------------------------------
 
+    def _view(self, key: str) -> list[dict]:
+        """Shared list of one entity store's values; callers must not mutate it."""
+        return self._memo("view:" + key, lambda: list(self.data[key].values()))
+
     def accounts(self) -> list[dict]:
-        return list(self.data["account"].values())
+        return self._view("account")
 
     def transactions(self) -> list[dict]:
-        return list(self.data["transaction"].values())
+        return self._view("transaction")
 
     def tags(self) -> list[dict]:
-        return list(self.data["tag"].values())
+        return self._view("tag")
 
     def instruments(self) -> list[dict]:
-        return list(self.data["instrument"].values())
+        return self._view("instrument")
 
     def budgets(self) -> list[dict]:
-        return list(self.data["budget"].values())
+        return self._view("budget")
 
     def reminders(self) -> list[dict]:
-        return list(self.data["reminder"].values())
+        return self._view("reminder")
 
     def reminder_markers(self) -> list[dict]:
-        return list(self.data["reminderMarker"].values())
+        return self._view("reminderMarker")
 
     def merchants(self) -> list[dict]:
-        return list(self.data["merchant"].values())
+        return self._view("merchant")
 
     def users(self) -> list[dict]:
-        return list(self.data["user"].values())
+        return self._view("user")
 
     def get(self, entity: str, eid: str) -> dict | None:
-        return self.data.get(entity, {}).get(str(eid))
+        return self.data.get(entity, {}).get(_id_str(eid))
 
     def get_instrument(self, iid: int | str) -> dict | None:
-        return self.data["instrument"].get(str(iid))
+        return self.data["instrument"].get(_id_str(iid))
 
     def get_account(self, aid: str) -> dict | None:
         return self.data["account"].get(aid)
@@ -272,13 +469,202 @@ class Cache:
     def get_tag(self, tid: str) -> dict | None:
         return self.data["tag"].get(tid)
 
+    def get_budget(self, category_id: str, month_date: str) -> dict | None:
+        return self.data["budget"].get(self._budget_key_for(category_id, month_date))
+
     def get_merchant(self, mid: str) -> dict | None:
         return self.data["merchant"].get(mid)
 
+    def instrument_titles(self) -> dict[Any, str]:
+        """Instrument id (as stored on entities, usually int) -> shortTitle."""
+        return self._memo("instrument_titles", lambda: {
+            i.get("id"): i.get("shortTitle") for i in self.data["instrument"].values()
+        })
+
+    def used_instruments(self) -> list[dict]:
+        """Instruments referenced by at least one account, in cache order."""
+        def build() -> list[dict]:
+            used_ids = {a.get("instrument") for a in self.data["account"].values()}
+            return [i for i in self.data["instrument"].values() if i.get("id") in used_ids]
+        return self._memo("used_instruments", build)
+
+    def account_titles(self) -> dict[str, str]:
+        return self._memo("account_titles", lambda: {
+            aid: a.get("title") for aid, a in self.data["account"].items()
+        })
+
+    def account_currencies(self) -> dict[str, str]:
+        """Account id -> its instrument's shortTitle ("RUB" if the instrument is unknown)."""
+        def build() -> dict[str, str]:
+            instr_titles = self.instrument_titles()
+            return {
+                aid: instr_titles.get(a.get("instrument"), "RUB")
+                for aid, a in self.data["account"].items()
+            }
+        return self._memo("account_currencies", build)
+
+    def tag_titles(self) -> dict[str, str]:
+        return self._memo("tag_titles", lambda: {
+            tid: t.get("title") for tid, t in self.data["tag"].items()
+        })
+
+    def tag_ids_by_lower_title(self) -> dict[str, str]:
+        """Lowercased tag title -> tag id; the first tag with a given title wins."""
+        def build() -> dict[str, str]:
+            index: dict[str, str] = {}
+            for tag in self.data["tag"].values():
+                index.setdefault((tag.get("title") or "").lower(), tag["id"])
+            return index
+        return self._memo("tag_ids_by_lower_title", build)
+
+    def merchants_with_lower_titles(self) -> list[tuple[str, dict]]:
+        """(lowercased title, merchant) pairs, in merchants() order."""
+        return self._memo("merchants_with_lower_titles", lambda: [
+            (m.get("title", "").lower(), m) for m in self.merchants()
+        ])
+
+    def merchant_titles(self) -> dict[str, str]:
+        return self._memo("merchant_titles", lambda: {
+            mid: m.get("title") for mid, m in self.data["merchant"].items()
+        })
+
+    def type_of(self, entity: dict) -> str:
+        """_tx_type() of a transaction or reminder, computed once per cache state."""
+        types = self._memo("types", dict)
+        eid = entity.get("id")
+        tt = types.get(eid)
+        if tt is None:
+            tt = _tx_type(entity)
+            if eid is not None:
+                types[eid] = tt
+        return tt
+
+    def formatted(self, kind: str, entity: dict, fmt: Any) -> dict:
+        """fmt(entity), cached per entity id until the cache changes.
+
+        Returns a fresh top-level dict, so callers may add keys to it.
+        """
+        cached = self._memo("fmt:" + kind, dict)
+        eid = entity.get("id")
+        result = cached.get(eid)
+        if result is None:
+            result = cached[eid] = fmt(entity)
+        return dict(result)
+
+    def response(self, key: str, build: Any) -> str:
+        """Serialized tool response for key, built once per cache state."""
+        return self._memo("response:" + key, build)
+
+    # -- transaction indexes ------------------------------------------------
+
+    def markers_by_reminder(self) -> dict[str, list[dict]]:
+        """Reminder id -> its reminder markers, in cache order."""
+        def build() -> dict[str, list[dict]]:
+            index: dict[str, list[dict]] = {}
+            for m in self.data["reminderMarker"].values():
+                index.setdefault(m.get("reminder"), []).append(m)
+            return index
+        return self._memo("markers_by_reminder", build)
+
+    def transactions_newest_first(self) -> list[dict]:
+        """Non-deleted transactions sorted by (date, created), newest first."""
+        return self._memo("tx_newest_first", lambda: sorted(
+            (t for t in self.data["transaction"].values() if not t.get("deleted")),
+            key=lambda t: (t.get("date", ""), t.get("created", 0)),
+            reverse=True,
+        ))
+
+    def transactions_between(self, start_date: str, end_date: str) -> list[dict]:
+        """Slice of transactions_newest_first() with start_date <= date <= end_date."""
+        txs = self.transactions_newest_first()
+        # the same dates, oldest first, for bisect
+        dates = self._memo("tx_dates_ascending", lambda: [t.get("date", "") for t in reversed(txs)])
+        lo = bisect.bisect_left(dates, start_date)
+        hi = bisect.bisect_right(dates, end_date)
+        if lo >= hi:
+            return []
+        return txs[len(txs) - hi:len(txs) - lo]
+
+    def transactions_in_period(
+        self, start_date: str, end_date: str, types: tuple[str, ...] | None = None,
+    ) -> list[dict]:
+        """Non-deleted transactions with start_date <= date <= end_date, in cache order.
+
+        types, if given, keeps only transactions whose _tx_type() is in it;
+        the type is worked out once per transaction when the index is built.
+        """
+        def build() -> tuple[list[str], list[tuple[str, int, dict, str]]]:
+            rows = [
+                (t.get("date", ""), pos, t, _tx_type(t))
+                for pos, t in enumerate(self.data["transaction"].values())
+                if not t.get("deleted")
+            ]
+            rows.sort(key=operator.itemgetter(0))
+            return [row[0] for row in rows], rows
+        dates, rows = self._memo("tx_by_date", build)
+        window = rows[bisect.bisect_left(dates, start_date):bisect.bisect_right(dates, end_date)]
+        if types is not None:
+            window = [row for row in window if row[3] in types]
+        # back to cache order, which the aggregations' output order depends on
+        window.sort(key=operator.itemgetter(1))
+        return [row[2] for row in window]
+
+    def transactions_by_account(self) -> dict[str, list[dict]]:
+        """Account id -> its transactions (either side), newest first."""
+        def build() -> dict[str, list[dict]]:
+            index: dict[str, list[dict]] = {}
+            for t in self.transactions_newest_first():
+                income_acct, outcome_acct = t.get("incomeAccount"), t.get("outcomeAccount")
+                index.setdefault(outcome_acct, []).append(t)
+                if income_acct != outcome_acct:
+                    index.setdefault(income_acct, []).append(t)
+            return index
+        return self._memo("tx_by_account", build)
+
+    def transactions_by_tag(self) -> dict[str, list[dict]]:
+        """Tag id -> transactions carrying it, newest first."""
+        def build() -> dict[str, list[dict]]:
+            index: dict[str, list[dict]] = {}
+            for t in self.transactions_newest_first():
+                for tid in dict.fromkeys(t.get("tag") or ()):
+                    index.setdefault(tid, []).append(t)
+            return index
+        return self._memo("tx_by_tag", build)
+
     def first_user(self) -> dict | None:
         users = self.users()
         return users[0] if users else None
 
+    def children_by_parent(self) -> dict[str, list[dict]]:
+        """Parent tag id -> child tags, in cache order."""
+        def build() -> dict[str, list[dict]]:
+            index: dict[str, list[dict]] = {}
+            for tag in self.data["tag"].values():
+                if tag.get("parent"):
+                    index.setdefault(tag["parent"], []).append(tag)
+            return index
+        return self._memo("children_by_parent", build)
+
+    def category_tree(self) -> list[dict]:
+        """Root categories with their children, as returned by get_categories."""
+        def build() -> list[dict]:
+            children_by_parent = self.children_by_parent()
+            tree = []
+            for root in self.data["tag"].values():
+                if root.get("parent"):
+                    continue
+                node: dict[str, Any] = {"id": root["id"], "title": root["title"]}
+                child_list = [{"id": c["id"], "title": c["title"]} for c in children_by_parent.get(root["id"], [])]
+                if child_list:
+                    node["children"] = child_list
+                tree.append(node)
+            return tree
+        return self._memo("category_tree", build)
+
+    def category_index(self) -> dict[str, dict]:
+        """build_category_index(), built once per cache state."""
+        return self._memo("category_index", self.build_category_index)
+
     def build_category_index(self) -> dict[str, dict]:
         """Build flat category index with parent info from cache data.
 
@@ -370,7 +756,7 @@ CACHE = Cache()
 # ---------------------------------------------------------------------------
 # HTTP client (httpx, async)
 # ---------------------------------------------------------------------------
-import httpx  # noqa: E402
+# httpx is imported on first use so --list/--describe skip its import graph.
 
 _client: httpx.AsyncClient | None = None
 
@@ -378,7 +764,21 @@ _client: httpx.AsyncClient | None = None
 def _get_client() -> httpx.AsyncClient:
     global _client
     if _client is None or _client.is_closed:
-        _client = httpx.AsyncClient(timeout=60.0)
+        if not TOKEN:
+            raise RuntimeError("ZENMONEY_TOKEN is not set. Set env var or add to config.json")
+        import httpx
+
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            # HTTP/2 needs the optional h2 package (pip install httpx[http2])
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=30.0),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {TOKEN}",
+            },
+        )
     return _client
 
 
@@ -389,26 +789,73 @@ async def _close_client() -> None:
         _client = None
 
 
-async def _api_post(endpoint: str, body: dict) -> dict:
-    """POST to ZenMoney API, returns parsed JSON."""
-    if not TOKEN:
-        raise RuntimeError("ZENMONEY_TOKEN is not set. Set env var or add to config.json")
-    client = _get_client()
-    resp = await client.post(
-        f"{BASE_URL}{endpoint}",
-        json=body,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {TOKEN}",
-        },
-    )
+def _raise_for_status(resp: httpx.Response) -> None:
     if resp.status_code == 401:
         raise RuntimeError("Token expired (401). Get a new token from https://budgera.com/settings/export")
     resp.raise_for_status()
-    return resp.json()
 
 
-async def _sync(extra: dict | None = None) -> dict:
+async def _api_post(endpoint: str, body: dict) -> dict:
+    """POST to ZenMoney API, returns parsed JSON."""
+    client = _get_client()
+    resp = await client.post(endpoint, json=body)
+    _raise_for_status(resp)
+    return _loads(resp.content)
+
+
+class _AsyncByteReader:
+    """Async file-like adapter over an httpx byte stream, as ijson expects."""
+
+    def __init__(self, chunks: Any) -> None:
+        self._chunks = chunks.__aiter__()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the stream type with read(0)
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+async def _api_post_diff_stream(endpoint: str, body: dict) -> None:
+    """POST a diff request and apply the response to CACHE while it streams in.
+
+    Each top-level entity array is applied as soon as ijson has parsed it,
+    so the full response is never held in memory as one dict. Deletions
+    are applied last, matching Cache.apply_diff ordering, and
+    serverTimestamp only once the whole body has arrived. If the stream
+    fails partway, CACHE is rolled back to its state before the request,
+    so a later sync asks for the same diff again.
+    """
+    client = _get_client()
+    state = CACHE.checkpoint()
+    try:
+        async with client.stream("POST", endpoint, json=body) as resp:
+            _raise_for_status(resp)
+            deletions = None
+            server_timestamp = None
+            reader = _AsyncByteReader(resp.aiter_bytes())
+            async for key, value in ijson.kvitems_async(reader, "", use_float=True):
+                if key == "deletion":
+                    deletions = value
+                elif key == "serverTimestamp":
+                    server_timestamp = value
+                else:
+                    CACHE.apply_diff({key: value})
+    except BaseException:
+        CACHE.rollback(state)
+        raise
+    tail: dict[str, Any] = {}
+    if deletions:
+        tail["deletion"] = deletions
+    if server_timestamp is not None:
+        tail["serverTimestamp"] = server_timestamp
+    if tail:
+        CACHE.apply_diff(tail)
+
+
+async def _sync(extra: dict | None = None) -> None:
     """Incremental or full sync via /v8/diff/."""
     body: dict[str, Any] = {
         "currentClientTimestamp": _now_ts(),
@@ -416,10 +863,24 @@ async def _sync(extra: dict | None = None) -> dict:
     }
     if extra:
         body.update(extra)
-    diff = await _api_post("/v8/diff/", body)
-    CACHE.apply_diff(diff)
-    CACHE.save()
-    return diff
+    if ijson is not None:
+        await _api_post_diff_stream("/v8/diff/", body)
+    else:
+        CACHE.apply_diff(await _api_post("/v8/diff/", body))
+    await CACHE.save_async()
+    if SYNC_TTL > 0:
+        SYNC_STAMP_PATH.touch()
+
+
+async def _sync_unless_fresh(tools: Iterable[str]) -> None:
+    """_sync(), unless only read tools run and the last sync is within SYNC_TTL."""
+    if SYNC_TTL > 0 and CACHE.server_timestamp and _READ_ONLY_TOOLS.issuperset(tools):
+        try:
+            if time.time() - SYNC_STAMP_PATH.stat().st_mtime < SYNC_TTL:
+                return
+        except OSError:
+            pass
+    await _sync()
 
 
 async def _write_diff(changes: dict) -> dict:
@@ -431,10 +892,29 @@ async def _write_diff(changes: dict) -> dict:
     body.update(changes)
     diff = await _api_post("/v8/diff/", body)
     CACHE.apply_diff(diff)
-    CACHE.save()
+    await CACHE.save_async()
     return diff
 
 
+class WriteBatch:
+    """Collects entity changes for several objects and writes them in one /v8/diff/ POST."""
+
+    def __init__(self) -> None:
+        self.changes: dict[str, list[dict]] = {}
+
+    def add(self, key: str, *items: dict) -> WriteBatch:
+        self.changes.setdefault(key, []).extend(items)
+        return self
+
+    def delete(self, obj: str, entity: dict, stamp: int) -> WriteBatch:
+        return self.add("deletion", {"id": entity["id"], "object": obj, "stamp": stamp, "user": entity["user"]})
+
+    async def commit(self) -> dict:
+        if not self.changes:
+            return {}
+        return await _write_diff(self.changes)
+
+
 # ---------------------------------------------------------------------------
 # Format helpers
 # ---------------------------------------------------------------------------
@@ -457,32 +937,14 @@ def _fmt_account(a: dict) -> dict:
 
 
 def _tx_type(t: dict) -> str:
-    is_transfer = (
-        t.get("outcomeAccount") != t.get("incomeAccount")
-        and t.get("outcome", 0) > 0
-        and t.get("income", 0) > 0
-    )
-    if is_transfer:
-        return "transfer"
-    if t.get("outcome", 0) > 0 and t.get("income", 0) == 0:
+    """Determine transaction or reminder type: expense, income, transfer, or unknown."""
+    outcome = t.get("outcome", 0)
+    income = t.get("income", 0)
+    if outcome > 0 and income > 0:
+        return "transfer" if t.get("outcomeAccount") != t.get("incomeAccount") else "unknown"
+    if outcome > 0 and income == 0:
         return "expense"
-    if t.get("income", 0) > 0 and t.get("outcome", 0) == 0:
-        return "income"
-    return "unknown"
-
-
-def _reminder_type(r: dict) -> str:
-    """Determine reminder type: expense, income, transfer, or unknown."""
-    is_transfer = (
-        r.get("outcomeAccount") != r.get("incomeAccount")
-        and r.get("outcome", 0) > 0
-        and r.get("income", 0) > 0
-    )
-    if is_transfer:
-        return "transfer"
-    if r.get("outcome", 0) > 0 and r.get("income", 0) == 0:
-        return "expense"
-    if r.get("income", 0) > 0 and r.get("outcome", 0) == 0:
+    if income > 0 and outcome == 0:
         return "income"
     return "unknown"
 
@@ -532,117 +994,124 @@ _BUDGET_MODE_DEFAULTS: dict[str, dict[str, Any]] = {
 }
 
 
+# Account kinds the transfer rules match on (bit flags)
+_KIND_CREDIT = 1
+_KIND_DEBT = 2
+_KIND_SAVINGS = 4
+
+# Structured transfer rules, checked in order: (result, mode_config flag, account kind).
+# Expense rules match the destination account and count when count_all_movements
+# is on or the source is inBalance; income rules match the source account and
+# count when count_all_movements is on or the destination is inBalance.
+_TRANSFER_RULES: tuple[tuple[str, str, int], ...] = (
+    ("expense", "to_credit", _KIND_CREDIT),    # debt repayment
+    ("expense", "to_debt", _KIND_DEBT),        # loan/debt repayment
+    ("expense", "to_savings", _KIND_SAVINGS),  # withdrawal from circulation
+    ("income", "from_savings", _KIND_SAVINGS),  # return to circulation
+    ("income", "from_credit", _KIND_CREDIT),
+    ("income", "from_debt", _KIND_DEBT),
+)
+
+
+def _account_kind(acct_type: str | None, subtype: str | None, savings: bool) -> int:
+    kind = 0
+    if subtype == "credit":
+        kind |= _KIND_CREDIT
+    if acct_type in ("loan", "debt"):
+        kind |= _KIND_DEBT
+    if subtype == "savings" or savings:
+        kind |= _KIND_SAVINGS
+    return kind
+
+
+def _transfer_rules(mode_config: dict) -> tuple[bool, tuple[tuple[str, int], ...], bool, bool]:
+    """Flatten *mode_config* once into (count_all, enabled rules, generic_out, generic_in)."""
+    cfg = {"expense": mode_config.get("expense", {}), "income": mode_config.get("income", {})}
+    rules = tuple(
+        (result, kind) for result, flag, kind in _TRANSFER_RULES
+        if cfg[result].get(flag, False)
+    )
+    return (
+        mode_config.get("count_all_movements", False),
+        rules,
+        cfg["expense"].get("to_other_off_balance", False),
+        cfg["income"].get("from_other_off_balance", False),
+    )
+
+
 def classify_transfer(item: dict, mode_config: dict) -> tuple[str, float] | None:
     """Classify a transfer as ('expense', amount), ('income', amount), or None.
 
     Uses *mode_config* flags to decide which transfers count.
     """
-    to_type = item.get("to_account_type")
-    to_subtype = item.get("to_account_subtype")
-    to_savings = item.get("to_account_savings", False)
+    return _classify_transfer(item, _transfer_rules(mode_config))
 
-    from_type = item.get("from_account_type")
-    from_subtype = item.get("from_account_subtype")
-    from_savings = item.get("from_account_savings", False)
 
+def _classify_transfer(item: dict, rules: tuple) -> tuple[str, float] | None:
+    """classify_transfer with mode_config already flattened by _transfer_rules."""
     from_in_balance = item.get("from_in_balance", False)
     to_in_balance = item.get("to_in_balance", False)
 
-    count_all = mode_config.get("count_all_movements", False)
-    expense_cfg = mode_config.get("expense", {})
-    income_cfg = mode_config.get("income", {})
-
-    amount = item.get("amount", 0)
-
     # Transfers between two inBalance accounts are balance-neutral
     # (money stays within the balance perimeter)
     if from_in_balance and to_in_balance:
         return None
 
-    # --- Expense checks (outflows) ---
-
-    # 1. Transfer TO credit account (debt repayment)
-    if to_subtype == "credit" and expense_cfg.get("to_credit", False):
-        if count_all or from_in_balance:
-            return ("expense", amount)
-
-    # 2. Transfer TO loan/debt account (debt repayment)
-    if to_type in ("loan", "debt") and expense_cfg.get("to_debt", False):
-        if count_all or from_in_balance:
-            return ("expense", amount)
-
-    # 3. Transfer TO savings account (withdrawal from circulation)
-    if (to_subtype == "savings" or to_savings) and expense_cfg.get("to_savings", False):
-        if count_all or from_in_balance:
-            return ("expense", amount)
-
-    # --- Income checks (inflows) ---
-
-    # 4. Transfer FROM savings account (return to circulation)
-    if (from_subtype == "savings" or from_savings) and income_cfg.get("from_savings", False):
-        if count_all or to_in_balance:
-            return ("income", amount)
-
-    # 5. Transfer FROM credit account
-    if from_subtype == "credit" and income_cfg.get("from_credit", False):
-        if count_all or to_in_balance:
-            return ("income", amount)
-
-    # 6. Transfer FROM loan/debt account
-    if from_type in ("loan", "debt") and income_cfg.get("from_debt", False):
-        if count_all or to_in_balance:
-            return ("income", amount)
-
-    # --- Generic off-balance checks ---
-
-    # 7. Generic off-balance outflow (from inBalance to off-balance)
-    if expense_cfg.get("to_other_off_balance", False):
-        if from_in_balance and not to_in_balance:
-            return ("expense", amount)
-
-    # 8. Generic off-balance inflow (from off-balance to inBalance)
-    if income_cfg.get("from_other_off_balance", False):
-        if not from_in_balance and to_in_balance:
-            return ("income", amount)
+    count_all, structured, generic_out, generic_in = rules
+    amount = item.get("amount", 0)
 
-    # 9. No balance impact
+    # Credit / debt / savings accounts on either side
+    if structured:
+        to_kind = _account_kind(
+            item.get("to_account_type"), item.get("to_account_subtype"), item.get("to_account_savings", False)
+        )
+        from_kind = _account_kind(
+            item.get("from_account_type"), item.get("from_account_subtype"), item.get("from_account_savings", False)
+        )
+        for result, kind in structured:
+            if result == "expense":
+                if to_kind & kind and (count_all or from_in_balance):
+                    return ("expense", amount)
+            elif from_kind & kind and (count_all or to_in_balance):
+                return ("income", amount)
+
+    # Generic off-balance outflow (from inBalance to off-balance)
+    if generic_out and from_in_balance and not to_in_balance:
+        return ("expense", amount)
+
+    # Generic off-balance inflow (from off-balance to inBalance)
+    if generic_in and not from_in_balance and to_in_balance:
+        return ("income", amount)
+
+    # No balance impact
     return None
 
 
 def _fmt_transaction(t: dict) -> dict:
-    tt = _tx_type(t)
-    out_acct = CACHE.get_account(t.get("outcomeAccount", ""))
-    in_acct = CACHE.get_account(t.get("incomeAccount", ""))
-    out_instr = CACHE.get_instrument(t.get("outcomeInstrument", 0))
-    in_instr = CACHE.get_instrument(t.get("incomeInstrument", 0))
-    categories = []
-    for tid in (t.get("tag") or []):
-        tag = CACHE.get_tag(tid)
-        if tag:
-            categories.append(tag["title"])
-    merchant_name = None
-    if t.get("merchant"):
-        m = CACHE.get_merchant(t["merchant"])
-        if m:
-            merchant_name = m["title"]
+    tt = CACHE.type_of(t)
+    acct_titles = CACHE.account_titles()
+    instr_titles = CACHE.instrument_titles()
+    tag_titles = CACHE.tag_titles()
+    categories = [tag_titles[tid] for tid in (t.get("tag") or []) if tid in tag_titles]
+    merchant_name = CACHE.merchant_titles().get(t["merchant"]) if t.get("merchant") else None
 
     result: dict[str, Any] = {"id": t["id"], "date": t.get("date", ""), "type": tt}
 
     if tt == "expense":
         result["amount"] = t.get("outcome", 0)
-        result["currency"] = out_instr["shortTitle"] if out_instr else "RUB"
-        result["account"] = out_acct["title"] if out_acct else None
+        result["currency"] = instr_titles.get(t.get("outcomeInstrument", 0), "RUB")
+        result["account"] = acct_titles.get(t.get("outcomeAccount", ""))
     elif tt == "income":
         result["amount"] = t.get("income", 0)
-        result["currency"] = in_instr["shortTitle"] if in_instr else "RUB"
-        result["account"] = in_acct["title"] if in_acct else None
+        result["currency"] = instr_titles.get(t.get("incomeInstrument", 0), "RUB")
+        result["account"] = acct_titles.get(t.get("incomeAccount", ""))
     else:  # transfer
         result["outcomeAmount"] = t.get("outcome", 0)
-        result["outcomeCurrency"] = out_instr["shortTitle"] if out_instr else "RUB"
-        result["fromAccount"] = out_acct["title"] if out_acct else None
+        result["outcomeCurrency"] = instr_titles.get(t.get("outcomeInstrument", 0), "RUB")
+        result["fromAccount"] = acct_titles.get(t.get("outcomeAccount", ""))
         result["incomeAmount"] = t.get("income", 0)
-        result["incomeCurrency"] = in_instr["shortTitle"] if in_instr else "RUB"
-        result["toAccount"] = in_acct["title"] if in_acct else None
+        result["incomeCurrency"] = instr_titles.get(t.get("incomeInstrument", 0), "RUB")
+        result["toAccount"] = acct_titles.get(t.get("incomeAccount", ""))
 
     if categories:
         result["categories"] = categories
@@ -680,13 +1149,9 @@ def _fmt_budget(b: dict) -> dict:
 
 
 def _fmt_reminder(r: dict) -> dict:
-    in_acct = CACHE.get_account(r.get("incomeAccount", ""))
-    out_acct = CACHE.get_account(r.get("outcomeAccount", ""))
-    categories = []
-    for tid in (r.get("tag") or []):
-        tag = CACHE.get_tag(tid)
-        if tag:
-            categories.append(tag["title"])
+    acct_titles = CACHE.account_titles()
+    tag_titles = CACHE.tag_titles()
+    categories = [tag_titles[tid] for tid in (r.get("tag") or []) if tid in tag_titles]
     result: dict[str, Any] = {
         "id": r["id"],
         "payee": r.get("payee"),
@@ -696,8 +1161,8 @@ def _fmt_reminder(r: dict) -> dict:
         result["income"] = r["income"]
     if r.get("outcome", 0) != 0:
         result["outcome"] = r["outcome"]
-    result["fromAccount"] = out_acct["title"] if out_acct else None
-    result["toAccount"] = in_acct["title"] if in_acct else None
+    result["fromAccount"] = acct_titles.get(r.get("outcomeAccount", ""))
+    result["toAccount"] = acct_titles.get(r.get("incomeAccount", ""))
     if categories:
         result["categories"] = categories
     result["interval"] = r.get("interval")
@@ -932,18 +1397,85 @@ def _g(key: str, args: dict, default: Any = None) -> Any:
     return args.get(key, default)
 
 
+def _date_arg(key: str, args: dict) -> str:
+    """Optional yyyy-MM-dd argument: validated when given, today otherwise."""
+    value = args.get(key)
+    if not value:
+        return _today()
+    _validate_date(value, key)
+    return value
+
+
 def _find_category_id(name: str) -> str:
     """Resolve category name or UUID to a category id."""
     if name.upper() == "ALL":
         return "00000000-0000-0000-0000-000000000000"
     if CACHE.get_tag(name):
         return name
-    for tag in CACHE.tags():
-        if tag["title"].lower() == name.lower():
-            return tag["id"]
+    tag_id = CACHE.tag_ids_by_lower_title().get(name.lower())
+    if tag_id:
+        return tag_id
     raise ValueError(f"Category not found: {name}")
 
 
+def _expense_spec(amount: float, account_id: str, instrument_id: int, **_: Any) -> dict:
+    return {
+        "incomeInstrument": instrument_id,
+        "incomeAccount": account_id,
+        "income": 0,
+        "outcomeInstrument": instrument_id,
+        "outcomeAccount": account_id,
+        "outcome": amount,
+    }
+
+
+def _income_spec(amount: float, account_id: str, instrument_id: int, **_: Any) -> dict:
+    return {
+        "incomeInstrument": instrument_id,
+        "incomeAccount": account_id,
+        "income": amount,
+        "outcomeInstrument": instrument_id,
+        "outcomeAccount": account_id,
+        "outcome": 0,
+    }
+
+
+def _transfer_spec(
+    amount: float,
+    account_id: str,
+    account: dict,
+    to_account_id: str | None,
+    income_amount: float | None,
+    **_: Any,
+) -> dict:
+    if not to_account_id:
+        raise ValueError("to_account_id is required for transfer type")
+    to_acct = CACHE.get_account(to_account_id)
+    if not to_acct:
+        raise ValueError(f"Destination account not found: {to_account_id}")
+    if account.get("instrument") == to_acct.get("instrument"):
+        income = amount
+    elif income_amount:
+        income = income_amount
+    else:
+        raise ValueError("income_amount is required for cross-currency transfers")
+    return {
+        "incomeInstrument": to_acct.get("instrument", 0),
+        "incomeAccount": to_account_id,
+        "income": income,
+        "outcomeInstrument": account.get("instrument", 0),
+        "outcomeAccount": account_id,
+        "outcome": amount,
+    }
+
+
+_TX_SPEC_BUILDERS = {
+    "expense": _expense_spec,
+    "income": _income_spec,
+    "transfer": _transfer_spec,
+}
+
+
 def _build_tx_spec(
     tx_type: str,
     amount: float,
@@ -956,67 +1488,37 @@ def _build_tx_spec(
     account = CACHE.get_account(account_id)
     if not account:
         raise ValueError(f"Account not found: {account_id}")
-    instrument_id = currency_id if currency_id is not None else account.get("instrument", 0)
-
-    spec: dict[str, Any] = {
-        "incomeInstrument": instrument_id,
-        "incomeAccount": account_id,
-        "income": 0,
-        "outcomeInstrument": instrument_id,
-        "outcomeAccount": account_id,
-        "outcome": 0,
-    }
-
-    if tx_type == "expense":
-        spec["outcome"] = amount
-        spec["outcomeAccount"] = account_id
-        spec["outcomeInstrument"] = instrument_id
-        spec["incomeAccount"] = account_id
-        spec["incomeInstrument"] = instrument_id
-        spec["income"] = 0
-    elif tx_type == "income":
-        spec["income"] = amount
-        spec["incomeAccount"] = account_id
-        spec["incomeInstrument"] = instrument_id
-        spec["outcomeAccount"] = account_id
-        spec["outcomeInstrument"] = instrument_id
-        spec["outcome"] = 0
-    elif tx_type == "transfer":
-        if not to_account_id:
-            raise ValueError("to_account_id is required for transfer type")
-        to_acct = CACHE.get_account(to_account_id)
-        if not to_acct:
-            raise ValueError(f"Destination account not found: {to_account_id}")
-        spec["outcome"] = amount
-        spec["outcomeAccount"] = account_id
-        spec["outcomeInstrument"] = account.get("instrument", 0)
-        spec["incomeAccount"] = to_account_id
-        spec["incomeInstrument"] = to_acct.get("instrument", 0)
-        if account.get("instrument") != to_acct.get("instrument"):
-            if not income_amount:
-                raise ValueError("income_amount is required for cross-currency transfers")
-            spec["income"] = income_amount
-        else:
-            spec["income"] = amount
-    return spec
+    build = _TX_SPEC_BUILDERS.get(tx_type)
+    if build is None:
+        raise ValueError(f"Unknown transaction type: {tx_type}. Use expense, income or transfer")
+    return build(
+        amount=amount,
+        account_id=account_id,
+        account=account,
+        instrument_id=currency_id if currency_id is not None else account.get("instrument", 0),
+        to_account_id=to_account_id,
+        income_amount=income_amount,
+    )
 
 
 # -- Read tools --
 
 async def tool_get_accounts(args: dict) -> str:
     include_archived = bool(_g("include_archived", args, False))
-    accounts = CACHE.accounts()
-    if not include_archived:
-        accounts = [a for a in accounts if not a.get("archive")]
-    return json.dumps([_fmt_account(a) for a in accounts], ensure_ascii=False)
+
+    def build() -> str:
+        accounts = CACHE.accounts()
+        if not include_archived:
+            accounts = [a for a in accounts if not a.get("archive")]
+        return _dumps([CACHE.formatted("account", a, _fmt_account) for a in accounts])
+
+    return CACHE.response(f"get_accounts:{include_archived}", build)
 
 
 async def tool_get_transactions(args: dict) -> str:
     start_date = args["start_date"]
     _validate_date(start_date, "start_date")
-    end_date = _g("end_date", args) or _today()
-    if _g("end_date", args):
-        _validate_date(end_date, "end_date")
+    end_date = _date_arg("end_date", args)
     account_id = _g("account_id", args)
     category_id = _g("category_id", args)
     tx_type = _g("type", args)
@@ -1028,62 +1530,66 @@ async def tool_get_transactions(args: dict) -> str:
     if category_id:
         _validate_uuid(category_id, "category_id")
 
-    txs = [t for t in CACHE.transactions() if not t.get("deleted")]
-    txs = [t for t in txs if t.get("date", "") >= start_date and t.get("date", "") <= end_date]
-
+    # Start from the narrowest index; every candidate list is already newest first
     if account_id:
-        txs = [t for t in txs if t.get("incomeAccount") == account_id or t.get("outcomeAccount") == account_id]
-    if category_id:
-        txs = [t for t in txs if category_id in (t.get("tag") or [])]
-    if tx_type:
-        txs = [t for t in txs if _tx_type(t) == tx_type]
+        txs = CACHE.transactions_by_account().get(account_id, [])
+    elif category_id:
+        txs = CACHE.transactions_by_tag().get(category_id, [])
+    else:
+        txs = CACHE.transactions_between(start_date, end_date)
+
+    # Remaining predicates in one pass: the date range unless it was bisected,
+    # the category when the account index was used, and the type
+    check_dates = bool(account_id or category_id)
+    check_tag = bool(account_id and category_id)
+    if check_dates or tx_type:
+        type_of = CACHE.type_of
+        txs = [
+            t for t in txs
+            if (not check_dates or start_date <= t.get("date", "") <= end_date)
+            and (not check_tag or category_id in (t.get("tag") or []))
+            and (not tx_type or type_of(t) == tx_type)
+        ]
 
-    txs.sort(key=lambda t: (t.get("date", ""), t.get("created", 0)), reverse=True)
     total = len(txs)
     limited = txs[offset:offset + limit]
-    result: dict[str, Any] = {"transactions": [_fmt_transaction(t) for t in limited]}
+    result: dict[str, Any] = {"transactions": [CACHE.formatted("transaction", t, _fmt_transaction) for t in limited]}
     if total > offset + len(limited):
         result["truncated"] = True
         result["total"] = total
         result["showing"] = len(limited)
         result["offset"] = offset
-    return json.dumps(result, ensure_ascii=False)
+    return _dumps(result)
 
 
 async def tool_get_categories(args: dict) -> str:
-    tags = CACHE.tags()
-    roots = [t for t in tags if not t.get("parent")]
-    children = [t for t in tags if t.get("parent")]
-    tree = []
-    for root in roots:
-        child_list = [{"id": c["id"], "title": c["title"]} for c in children if c.get("parent") == root["id"]]
-        node: dict[str, Any] = {"id": root["id"], "title": root["title"]}
-        if child_list:
-            node["children"] = child_list
-        tree.append(node)
-    return json.dumps(tree, ensure_ascii=False)
+    return CACHE.response("get_categories", lambda: _dumps(CACHE.category_tree()))
 
 
 async def tool_get_instruments(args: dict) -> str:
     include_all = bool(_g("include_all", args, False))
-    instruments = CACHE.instruments()
-    if not include_all:
-        used_ids = {a.get("instrument") for a in CACHE.accounts()}
-        instruments = [i for i in instruments if i.get("id") in used_ids]
-    formatted = [
-        {"id": i["id"], "code": i.get("shortTitle", ""), "title": i.get("title", ""),
-         "symbol": i.get("symbol", ""), "rate": i.get("rate", 1)}
-        for i in instruments
-    ]
-    return json.dumps(formatted, ensure_ascii=False)
+
+    def build() -> str:
+        instruments = CACHE.instruments() if include_all else CACHE.used_instruments()
+        return _dumps([
+            {"id": i["id"], "code": i.get("shortTitle", ""), "title": i.get("title", ""),
+             "symbol": i.get("symbol", ""), "rate": i.get("rate", 1)}
+            for i in instruments
+        ])
+
+    return CACHE.response(f"get_instruments:{include_all}", build)
+
+
+def _budgets_for_month(month: str) -> list[dict]:
+    """Formatted budgets for a yyyy-MM month."""
+    month_date = f"{month}-01"
+    return [_fmt_budget(b) for b in CACHE.budgets() if b.get("date") == month_date]
 
 
 async def tool_get_budgets(args: dict) -> str:
     month = args["month"]
     _validate_month(month, "month")
-    month_date = f"{month}-01"
-    budgets = [b for b in CACHE.budgets() if b.get("date") == month_date]
-    return json.dumps([_fmt_budget(b) for b in budgets], ensure_ascii=False)
+    return _dumps(_budgets_for_month(month))
 
 
 async def tool_get_reminders(args: dict) -> str:
@@ -1123,14 +1629,14 @@ async def tool_get_reminders(args: dict) -> str:
 
     # Filter by type
     if r_type and r_type != "all":
-        reminders = [r for r in reminders if _reminder_type(r) == r_type]
+        reminders = [r for r in reminders if CACHE.type_of(r) == r_type]
 
     # Marker-based filtering mode
     if marker_from and marker_to:
-        all_markers = CACHE.reminder_markers()
+        markers_by_reminder = CACHE.markers_by_reminder()
         result_list = []
         for r in reminders:
-            markers = [m for m in all_markers if m.get("reminder") == r["id"]]
+            markers = markers_by_reminder.get(r["id"], [])
             if not include_processed:
                 markers = [m for m in markers if m.get("state") == "planned"]
             # Filter markers to the requested date range
@@ -1138,8 +1644,8 @@ async def tool_get_reminders(args: dict) -> str:
             if not markers:
                 continue
             markers.sort(key=lambda m: m.get("date", ""))
-            fmt = _fmt_reminder(r)
-            fmt["type"] = _reminder_type(r)
+            fmt = CACHE.formatted("reminder", r, _fmt_reminder)
+            fmt["type"] = CACHE.type_of(r)
             fmt["markers"] = [
                 {"id": m["id"], "date": m.get("date"), "state": m.get("state"),
                  "income": m.get("income", 0), "outcome": m.get("outcome", 0)}
@@ -1161,22 +1667,32 @@ async def tool_get_reminders(args: dict) -> str:
         output["total"] = total
         output["showing"] = len(result_list)
         output["offset"] = offset
-        return json.dumps(output, ensure_ascii=False)
+        return _dumps(output)
 
     # Legacy mode — sort by startDate
-    reminders.sort(key=lambda r: r.get("startDate", ""), reverse=True)
     total = len(reminders)
     eff_limit = min(limit, 200)
+    top_k = offset + eff_limit
+
+    def by_start_date(r: dict) -> str:
+        return r.get("startDate", "")
+
+    if 0 <= offset and top_k < total // 2:
+        # only the requested page is needed: select it without sorting everything
+        reminders = heapq.nlargest(top_k, reminders, key=by_start_date)
+    else:
+        reminders = sorted(reminders, key=by_start_date, reverse=True)
     reminders = reminders[offset:offset + eff_limit]
 
     result_list = []
+    markers_by_reminder = CACHE.markers_by_reminder()
     for r in reminders:
-        fmt = _fmt_reminder(r)
-        fmt["type"] = _reminder_type(r)
-        markers = [m for m in CACHE.reminder_markers() if m.get("reminder") == r["id"]]
+        fmt = CACHE.formatted("reminder", r, _fmt_reminder)
+        fmt["type"] = CACHE.type_of(r)
+        markers = markers_by_reminder.get(r["id"], [])
         if not include_processed:
             markers = [m for m in markers if m.get("state") == "planned"]
-        markers.sort(key=lambda m: m.get("date", ""))
+        markers = sorted(markers, key=lambda m: m.get("date", ""))
         markers = markers[:markers_limit]
         if markers:
             fmt["markers"] = [
@@ -1192,7 +1708,7 @@ async def tool_get_reminders(args: dict) -> str:
         output["total"] = total
         output["showing"] = len(result_list)
         output["offset"] = offset
-    return json.dumps(output, ensure_ascii=False)
+    return _dumps(output)
 
 
 def calculate_initial_balance(data: dict, period_start_date: str) -> float:
@@ -1280,13 +1796,13 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
     """Detailed budget analysis with income vs expenses by category."""
 
     # Build category index and accounts map from cache
-    cat_index = CACHE.build_category_index()
+    cat_index = CACHE.category_index()
 
     # Load accounts metadata from config
     config: dict[str, Any] = {}
     if _cfg_path.exists():
         try:
-            config = json.loads(_cfg_path.read_text(encoding="utf-8"))
+            config = _load_json_file(_cfg_path)
         except Exception:
             pass
 
@@ -1303,29 +1819,29 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
                 "label": mode_data.get("label", mode_id),
                 "description": mode_data.get("description", "")
             })
-        return json.dumps({
+        return _dumps({
             "setup_required": True,
             "message": "Необходимо выбрать режим работы с бюджетом",
             "modes": modes
-        }, ensure_ascii=False, indent=2)
+        }, pretty=True)
 
     # Resolve budget mode
     mode_name = _g("budget_mode", args) or config.get("budget_mode") or "income_vs_expense"
     mode_config = config.get("budget_modes", {}).get(mode_name)
     if not mode_config:
         mode_config = _BUDGET_MODE_DEFAULTS.get(mode_name, DEFAULT_INCOME_VS_EXPENSE)
+    count_all = mode_config.get("count_all_movements", False)
+    in_balance_ids = {acc_id for acc_id, acc in accounts_map.items() if acc["inBalance"]}
 
     # Determine period from billing_period_start_day or use provided dates
     show_forecast = _g("show_forecast", args, True)
     show_calendar = _g("show_calendar", args, True)
 
     # Calculate period dates
-    if _g("start_date", args):
-        start_date = args["start_date"]
+    start_date = _g("start_date", args)
+    if start_date:
         _validate_date(start_date, "start_date")
-        end_date = _g("end_date", args) or _today()
-        if _g("end_date", args):
-            _validate_date(end_date, "end_date")
+        end_date = _date_arg("end_date", args)
     else:
         # Auto-calculate from billing_period_start_day
         billing_start_day = config.get("billing_period_start_day", 1)
@@ -1341,8 +1857,16 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
             start_date = datetime.date(prev_month.year, prev_month.month, billing_start_day).isoformat()
             end_date = datetime.date(today.year, today.month, billing_start_day - 1).isoformat()
 
-    # Helper to enrich category with metadata
+    # Helper to enrich category with metadata (memoized: called once per transaction)
+    category_meta: dict[str | None, dict] = {}
+
     def enrich_category(cat_id: str) -> dict:
+        meta = category_meta.get(cat_id)
+        if meta is None:
+            meta = category_meta[cat_id] = build_category_meta(cat_id)
+        return meta
+
+    def build_category_meta(cat_id: str) -> dict:
         if not cat_id or cat_id not in cat_index:
             return {
                 "category_id": cat_id or "uncategorized",
@@ -1366,20 +1890,20 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         }
 
     # Get actual transactions
-    txs = [t for t in CACHE.transactions() if not t.get("deleted")]
-    txs = [t for t in txs if t.get("date", "") >= start_date and t.get("date", "") <= end_date]
+    txs = CACHE.transactions_in_period(start_date, end_date)
 
     # Get reminders with markers
     reminders_income = []
     reminders_expense = []
     reminders_transfer = []
 
+    markers_by_reminder = CACHE.markers_by_reminder()
+    tag_titles = CACHE.tag_titles()
     for r in (CACHE.reminders() or []):
         if r.get("deleted"):
             continue
-        markers = [m for m in (CACHE.reminder_markers() or [])
-                  if m.get("reminder") == r["id"]
-                  and not m.get("deleted")
+        markers = [m for m in markers_by_reminder.get(r["id"], [])
+                  if not m.get("deleted")
                   and start_date <= m.get("date", "") <= end_date]
         if not markers:
             continue
@@ -1396,7 +1920,7 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
             "id": r["id"],
             "payee": r.get("payee"),
             "comment": r.get("comment"),
-            "categories": [CACHE.get_tag(tid)["title"] if CACHE.get_tag(tid) else None for tid in (r.get("tag") or [])],
+            "categories": [tag_titles.get(tid) for tid in (r.get("tag") or [])],
             "category_ids": r.get("tag") or [],
             "account_id": r.get("outcomeAccount") if rtype == "expense" else r.get("incomeAccount"),
             "from_account_id": r.get("outcomeAccount") if rtype == "transfer" else None,
@@ -1424,10 +1948,8 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
 
     # Get budgets
     month = start_date[:7]  # yyyy-MM
-    # Get fresh budgets from API instead of cache
-    budgets_raw = json.loads(await tool_get_budgets({"month": month}))
     budgets_map = {}
-    for b in budgets_raw:
+    for b in _budgets_for_month(month):
         cat_id = b.get("category_id")
         if cat_id:
             budgets_map[cat_id] = {
@@ -1436,35 +1958,35 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
                 "category_name": b.get("category"),  # Save name for debugging
             }
 
-    # Process income
-    income_by_category: dict[str, dict] = {}
+    # Split period transactions by type in a single pass; the income, expense
+    # and transfer passes below then only walk their own bucket
+    txs_by_type: dict[str, list[dict]] = {}
     for tx in txs:
-        tt = _tx_type(tx)
-        if tt != "income":
-            continue
+        txs_by_type.setdefault(CACHE.type_of(tx), []).append(tx)
 
+    # Process income
+    income_by_category: dict[str, dict] = {}
+    for tx in txs_by_type.get("income", []):
         # Check if account should be counted based on mode
-        acct_id = tx.get("incomeAccount")
-        if not mode_config.get("count_all_movements", False):
-            acct = accounts_map.get(acct_id, {})
-            if not acct.get("inBalance", False):
-                continue
+        if not count_all and tx.get("incomeAccount") not in in_balance_ids:
+            continue
 
         cat_ids = tx.get("tag", [])
         cat_id = cat_ids[0] if cat_ids else None
         cat_meta = enrich_category(cat_id)
         cat_key = cat_meta["category_id"]
 
-        if cat_key not in income_by_category:
-            income_by_category[cat_key] = {
+        entry = income_by_category.get(cat_key)
+        if entry is None:
+            entry = income_by_category[cat_key] = {
                 **cat_meta,
                 "actual": 0,
                 "planned": 0,
                 "items": [],
             }
 
-        income_by_category[cat_key]["actual"] += tx.get("income", 0)
-        income_by_category[cat_key]["items"].append({
+        entry["actual"] += tx.get("income", 0)
+        entry["items"].append({
             "date": tx.get("date"),
             "payee": tx.get("payee"),
             "amount": tx.get("income", 0),
@@ -1480,52 +2002,49 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         cat_key = cat_meta["category_id"]
 
         # Check account based on mode
-        if not mode_config.get("count_all_movements", False):
-            acct = accounts_map.get(rem.get("account_id"), {})
-            if not acct.get("inBalance", False):
-                continue
+        if not count_all and rem.get("account_id") not in in_balance_ids:
+            continue
 
-        if cat_key not in income_by_category:
-            income_by_category[cat_key] = {
+        entry = income_by_category.get(cat_key)
+        if entry is None:
+            entry = income_by_category[cat_key] = {
                 **cat_meta,
                 "actual": 0,
                 "planned": 0,
                 "items": [],
             }
 
-        income_by_category[cat_key]["planned"] += sum(m["income"] for m in rem["markers"] if m.get("state") != "processed")
+        # one pass over the markers: planned total and calendar items together
+        planned = 0
+        items = entry["items"]
         for marker in rem["markers"]:
             if marker.get("state") == "processed":
                 continue
-            income_by_category[cat_key]["items"].append({
+            planned += marker["income"]
+            items.append({
                 "date": marker["date"],
                 "payee": rem.get("payee"),
                 "amount": marker["income"],
                 "comment": rem.get("comment"),
                 "status": marker.get("state", "planned"),
             })
+        entry["planned"] += planned
 
     # Process expenses
     expense_by_category: dict[str, dict] = {}
-    for tx in txs:
-        tt = _tx_type(tx)
-        if tt != "expense":
-            continue
-
+    for tx in txs_by_type.get("expense", []):
         # Check if account should be counted based on mode
-        acct_id = tx.get("outcomeAccount")
-        if not mode_config.get("count_all_movements", False):
-            acct = accounts_map.get(acct_id, {})
-            if not acct.get("inBalance", False):
-                continue
+        if not count_all and tx.get("outcomeAccount") not in in_balance_ids:
+            continue
 
         cat_ids = tx.get("tag", [])
         cat_id = cat_ids[0] if cat_ids else None
         cat_meta = enrich_category(cat_id)
         cat_key = cat_meta["category_id"]
 
-        if cat_key not in expense_by_category:
-            expense_by_category[cat_key] = {
+        entry = expense_by_category.get(cat_key)
+        if entry is None:
+            entry = expense_by_category[cat_key] = {
                 **cat_meta,
                 "actual": 0,
                 "planned_from_reminders": 0,
@@ -1533,8 +2052,8 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
                 "items": [],
             }
 
-        expense_by_category[cat_key]["actual"] += tx.get("outcome", 0)
-        expense_by_category[cat_key]["items"].append({
+        entry["actual"] += tx.get("outcome", 0)
+        entry["items"].append({
             "date": tx.get("date"),
             "payee": tx.get("payee"),
             "amount": tx.get("outcome", 0),
@@ -1550,13 +2069,12 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         cat_key = cat_meta["category_id"]
 
         # Check account based on mode
-        if not mode_config.get("count_all_movements", False):
-            acct = accounts_map.get(rem.get("account_id"), {})
-            if not acct.get("inBalance", False):
-                continue
+        if not count_all and rem.get("account_id") not in in_balance_ids:
+            continue
 
-        if cat_key not in expense_by_category:
-            expense_by_category[cat_key] = {
+        entry = expense_by_category.get(cat_key)
+        if entry is None:
+            entry = expense_by_category[cat_key] = {
                 **cat_meta,
                 "actual": 0,
                 "planned_from_reminders": 0,
@@ -1564,17 +2082,21 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
                 "items": [],
             }
 
-        expense_by_category[cat_key]["planned_from_reminders"] += sum(m["outcome"] for m in rem["markers"] if m.get("state") != "processed")
+        # one pass over the markers: planned total and calendar items together
+        planned = 0
+        items = entry["items"]
         for marker in rem["markers"]:
             if marker.get("state") == "processed":
                 continue
-            expense_by_category[cat_key]["items"].append({
+            planned += marker["outcome"]
+            items.append({
                 "date": marker["date"],
                 "payee": rem.get("payee"),
                 "amount": marker["outcome"],
                 "comment": rem.get("comment"),
                 "status": marker.get("state", "planned"),
             })
+        entry["planned_from_reminders"] += planned
 
     # Add budget data
     for cat_key, cat_data in expense_by_category.items():
@@ -1583,45 +2105,27 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
 
     # Add budget-only categories (categories with budget but no reminders/transactions)
     for cat_id, budget_data in budgets_map.items():
-        if budget_data["outcome"] == 0:
+        # Skip empty budgets and categories already present from transactions/reminders
+        if budget_data["outcome"] == 0 or cat_id in expense_by_category:
+            continue
+        # Only categories that still exist in the cache
+        if not CACHE.get_tag(cat_id):
             continue
 
-        # Check if this category already exists in expense_by_category
-        if cat_id in expense_by_category:
-            found = True
-        else:
-            found = False
-
-        # If not found, create new expense category
-        if not found:
-            # Find category by UUID in cache
-            cat_obj = None
-            for c in (CACHE.tags() or []):
-                if c.get("id") == cat_id:
-                    cat_obj = c
-                    break
-
-            if cat_obj:
-                cat_meta = enrich_category(cat_obj["id"])
-                cat_key = cat_meta["category_id"]
-
-                expense_by_category[cat_key] = {
-                    **cat_meta,
-                    "actual": 0,
-                    "planned_from_reminders": 0,
-                    "budget": budget_data["outcome"],
-                    "items": [],
-                }
+        cat_meta = enrich_category(cat_id)
+        expense_by_category[cat_meta["category_id"]] = {
+            **cat_meta,
+            "actual": 0,
+            "planned_from_reminders": 0,
+            "budget": budget_data["outcome"],
+            "items": [],
+        }
 
     # Process transfers
     transfer_items = []
 
     # Add actual transfers from transactions
-    for tx in txs:
-        tt = _tx_type(tx)
-        if tt != "transfer":
-            continue
-
+    for tx in txs_by_type.get("transfer", []):
         from_acct_id = tx.get("outcomeAccount")
         to_acct_id = tx.get("incomeAccount")
 
@@ -1633,7 +2137,7 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         to_in_balance = to_acct.get("inBalance", False)
 
         # Skip if both are off-balance and we're not in count_all_movements mode
-        if not mode_config.get("count_all_movements", False) and not from_in_balance and not to_in_balance:
+        if not count_all and not from_in_balance and not to_in_balance:
             continue
 
         # Transfer affects balance if:
@@ -1669,7 +2173,7 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         from_in_balance = from_acct.get("inBalance", False)
         to_in_balance = to_acct.get("inBalance", False)
 
-        if not mode_config.get("count_all_movements", False) and not from_in_balance and not to_in_balance:
+        if not count_all and not from_in_balance and not to_in_balance:
             continue
 
         for marker in rem["markers"]:
@@ -1765,9 +2269,7 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
             category_parents.add(cat["parent"])
 
     for parent_id in category_parents:
-        # Find parent category object
-        parent_cat = next((c for c in all_categories if c.get("id") == parent_id), None)
-        if not parent_cat:
+        if not CACHE.get_tag(parent_id):
             continue
 
         parent_meta = enrich_category(parent_id)
@@ -1863,8 +2365,9 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
     # Calculate transfer totals using mode-aware classify_transfer
     total_transfers_out = 0
     total_transfers_in = 0
+    transfer_rules = _transfer_rules(mode_config)
     for item in transfer_items:
-        result = classify_transfer(item, mode_config)
+        result = _classify_transfer(item, transfer_rules)
         if result:
             transfer_type, amount = result
             if transfer_type == "expense":
@@ -1931,38 +2434,58 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
     # Add income, expenses, transfers to result
     result["income"] = sorted(income_tree, key=lambda x: x["actual"] + x["planned"], reverse=True)
     result["expenses"] = sorted(expense_tree, key=lambda x: max(x["actual"] + x["planned_from_reminders"], x["budget"]), reverse=True)
-    result["transfers"] = sorted(transfer_items, key=lambda x: x["date"])
+    result["transfers"] = sorted(transfer_items, key=operator.itemgetter("date"))
 
-    # Helper to recursively collect items from tree
-    def collect_items_from_tree(nodes: list[dict], item_type: str) -> list[dict]:
-        """Recursively collect all items from tree nodes."""
-        items = []
-        for node in nodes:
-            # If node has children, recurse
-            if "children" in node:
-                items.extend(collect_items_from_tree(node["children"], item_type))
-            # If node has items (leaf node), collect them
-            elif "items" in node:
-                for item in node["items"]:
-                    items.append({
-                        "date": item["date"],
-                        "type": item_type,
-                        "category": node["category_name"],
-                        "payee": item["payee"],
-                        "amount": item["amount"],
-                        "status": item["status"],
-                    })
-        return items
-
-    # Add calendar if requested
+    # Add calendar if requested. The forecast's per-day buckets of
+    # (sign, amount) are filled in the same pass; they stay empty when the
+    # calendar is off
+    daily_ops: dict[str, list] = {}
     if show_calendar:
-        calendar = []
-        # Add all items from income and expenses trees
-        calendar.extend(collect_items_from_tree(income_tree, "income"))
-        calendar.extend(collect_items_from_tree(expense_tree, "expense"))
-        # Add transfers
+        # Single pass over both trees and the transfers; the stable sort by date
+        # keeps income before expense before transfers within a day, which is
+        # also the order operations land in their daily_ops bucket
+        calendar: list[dict] = []
+        add = calendar.append
+        day_ops = daily_ops.setdefault
+
+        def collect_items_from_tree(nodes: list[dict], item_type: str, sign: int) -> None:
+            """Recursively add all leaf items of the tree to the calendar."""
+            for node in nodes:
+                # If node has children, recurse
+                if "children" in node:
+                    collect_items_from_tree(node["children"], item_type, sign)
+                # If node has items (leaf node), collect them
+                elif "items" in node:
+                    category = node["category_name"]
+                    for item in node["items"]:
+                        entry = {
+                            "date": item["date"],
+                            "type": item_type,
+                            "category": category,
+                            "payee": item["payee"],
+                            "amount": item["amount"],
+                            "status": item["status"],
+                        }
+                        add(entry)
+                        day_ops(entry["date"], []).append((sign, entry["amount"]))
+
+        collect_items_from_tree(income_tree, "income", 1)
+        collect_items_from_tree(expense_tree, "expense", -1)
         for item in transfer_items:
-            calendar.append({
+            # Transfer impact on balance depends on account types:
+            # - inBalance → off-balance: decreases balance
+            # - off-balance → inBalance: increases balance (when count_all_movements=true)
+            # - inBalance → inBalance: no net effect (both sides counted)
+            # - off-balance → off-balance: no effect
+            from_in = item["from_in_balance"]
+            to_in = item["to_in_balance"]
+            if from_in and not to_in:
+                sign = -1
+            elif not from_in and to_in:
+                sign = 1
+            else:
+                sign = 0
+            entry = {
                 "date": item["date"],
                 "type": "transfer",
                 "from_account": item["from_account"],
@@ -1972,8 +2495,10 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
                 "status": item["status"],
                 "from_in_balance": item["from_in_balance"],
                 "to_in_balance": item["to_in_balance"],
-            })
-        calendar.sort(key=lambda x: x["date"])
+            }
+            add(entry)
+            day_ops(entry["date"], []).append((sign, entry["amount"]))
+        calendar.sort(key=operator.itemgetter("date"))
         result["calendar"] = calendar
 
     # Add forecast if requested
@@ -1982,61 +2507,34 @@ async def tool_analyze_budget_detailed(args: dict) -> str:
         current_balance = sum(
             a.get("balance", 0)
             for a in accounts_map.values()
-            if mode_config.get("count_all_movements", False) or a.get("inBalance", False)
+            if count_all or a["inBalance"]
         )
 
         # Build daily forecast
         forecast = []
         balance = current_balance
 
-        # Group calendar by date
-        from collections import defaultdict
-        daily_ops: dict[str, list] = defaultdict(list)
-        if show_calendar and "calendar" in result:
-            for op in result["calendar"]:
-                daily_ops[op["date"]].append(op)
-
-        current_date = datetime.date.fromisoformat(start_date)
-        end_date_obj = datetime.date.fromisoformat(end_date)
-
-        while current_date <= end_date_obj:
-            date_str = current_date.isoformat()
-            ops = daily_ops.get(date_str, [])
-
-            for op in ops:
-                if op["type"] == "income":
-                    balance += op["amount"]
-                elif op["type"] == "expense":
-                    balance -= op["amount"]
-                elif op["type"] == "transfer":
-                    # Transfer impact on balance depends on account types:
-                    # - inBalance → off-balance: decreases balance
-                    # - off-balance → inBalance: increases balance
-                    # - inBalance → inBalance: no net effect (both sides counted)
-                    # - off-balance → off-balance: no effect
-                    from_in = op.get("from_in_balance", False)
-                    to_in = op.get("to_in_balance", False)
-
-                    if from_in and not to_in:
-                        # Outflow from tracked balance
-                        balance -= op["amount"]
-                    elif not from_in and to_in:
-                        # Inflow to tracked balance (when count_all_movements=true)
-                        balance += op["amount"]
-                    # else: both in or both out = no net change to tracked balance
-
-            if ops:  # Only add to forecast if there were operations
-                forecast.append({
-                    "date": date_str,
-                    "balance": round(balance) if config.get("round_balance_to_integer", True) else round(balance, 2),
-                    "operations_count": len(ops),
-                })
-
-            current_date += datetime.timedelta(days=1)
+        # The balance only moves on days with operations, and only those days are
+        # reported, so walk them in date order instead of every day of the period
+        round_to_integer = config.get("round_balance_to_integer", True)
+        op_days = sorted(d for d in daily_ops if start_date <= d <= end_date and _is_iso_date(d))
+
+        for date_str in op_days:
+            ops = daily_ops[date_str]
+
+            for sign, amount in ops:
+                if sign:
+                    balance += sign * amount
+
+            forecast.append({
+                "date": date_str,
+                "balance": round(balance) if round_to_integer else round(balance, 2),
+                "operations_count": len(ops),
+            })
 
         result["forecast"] = forecast
 
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    return _dumps(result)
 
 
 async def tool_setup_budget_mode(args: dict) -> str:
@@ -2054,7 +2552,7 @@ async def tool_setup_budget_mode(args: dict) -> str:
     config: dict[str, Any] = {}
     if cfg_path.exists():
         try:
-            config = json.loads(cfg_path.read_text(encoding="utf-8"))
+            config = dict(_load_json_file(cfg_path))
         except Exception:
             pass
 
@@ -2065,44 +2563,45 @@ async def tool_setup_budget_mode(args: dict) -> str:
     # Save config
     with open(cfg_path, "w", encoding="utf-8") as f:
         json.dump(config, f, indent=2, ensure_ascii=False)
+    _json_file_cache.pop(cfg_path, None)
 
     # Get mode details
     mode_config = config.get("budget_modes", {}).get(mode, {})
 
-    return json.dumps({
+    return _dumps({
         "success": True,
         "mode": mode,
         "label": mode_config.get("label", mode),
         "description": mode_config.get("description", ""),
         "message": f"Режим '{mode_config.get('label', mode)}' успешно установлен"
-    }, ensure_ascii=False, indent=2)
+    }, pretty=True)
+
+
+# get_analytics "type" argument -> transaction types it aggregates
+_ANALYTICS_TYPES = {
+    "expense": ("expense",),
+    "income": ("income",),
+    "all": ("expense", "income"),
+}
 
 
 async def tool_get_analytics(args: dict) -> str:
     start_date = args["start_date"]
     _validate_date(start_date, "start_date")
-    end_date = _g("end_date", args) or _today()
-    if _g("end_date", args):
-        _validate_date(end_date, "end_date")
+    end_date = _date_arg("end_date", args)
     group_by = _g("group_by", args, "category")
     an_type = _g("type", args, "expense")
 
-    txs = [t for t in CACHE.transactions() if not t.get("deleted")]
-    txs = [t for t in txs if t.get("date", "") >= start_date and t.get("date", "") <= end_date]
-
     # Filter by type
-    filtered = []
-    for t in txs:
-        tt = _tx_type(t)
-        if an_type == "expense" and tt == "expense":
-            filtered.append(t)
-        elif an_type == "income" and tt == "income":
-            filtered.append(t)
-        elif an_type == "all" and tt in ("expense", "income"):
-            filtered.append(t)
+    wanted_types = _ANALYTICS_TYPES.get(an_type, ())
+    filtered = CACHE.transactions_in_period(start_date, end_date, wanted_types)
 
     # Group
     groups: dict[str, dict[str, Any]] = {}
+    acct_titles = CACHE.account_titles()
+    acct_currencies = CACHE.account_currencies()
+    tag_titles = CACHE.tag_titles()
+    merchant_titles = CACHE.merchant_titles()
     for tx in filtered:
         key = "Uncategorized"
         currency = "RUB"
@@ -2110,28 +2609,24 @@ async def tool_get_analytics(args: dict) -> str:
         if group_by == "category":
             tag_ids = tx.get("tag") or []
             if tag_ids:
-                tag = CACHE.get_tag(tag_ids[0])
-                key = tag["title"] if tag else "Uncategorized"
+                key = tag_titles.get(tag_ids[0], "Uncategorized")
             acct_id = tx.get("outcomeAccount") if tx.get("outcome", 0) > 0 else tx.get("incomeAccount")
-            acct = CACHE.get_account(acct_id) if acct_id else None
-            instr = CACHE.get_instrument(acct["instrument"]) if acct else None
-            currency = instr["shortTitle"] if instr else "RUB"
+            currency = acct_currencies.get(acct_id, "RUB")
         elif group_by == "account":
             acct_id = tx.get("incomeAccount") if an_type == "income" else tx.get("outcomeAccount")
-            acct = CACHE.get_account(acct_id) if acct_id else None
-            key = acct["title"] if acct else "Unknown Account"
-            instr = CACHE.get_instrument(acct["instrument"]) if acct else None
-            currency = instr["shortTitle"] if instr else "RUB"
+            key = acct_titles.get(acct_id, "Unknown Account")
+            currency = acct_currencies.get(acct_id, "RUB")
         elif group_by == "merchant":
-            if tx.get("merchant"):
-                m = CACHE.get_merchant(tx["merchant"])
-                key = m["title"] if m else (tx.get("payee") or "Unknown Merchant")
+            merchant_id = tx.get("merchant")
+            if merchant_id:
+                if merchant_id in merchant_titles:
+                    key = merchant_titles[merchant_id]
+                else:
+                    key = tx.get("payee") or "Unknown Merchant"
             elif tx.get("payee"):
                 key = tx["payee"]
             acct_id = tx.get("outcomeAccount") if tx.get("outcome", 0) > 0 else tx.get("incomeAccount")
-            acct = CACHE.get_account(acct_id) if acct_id else None
-            instr = CACHE.get_instrument(acct["instrument"]) if acct else None
-            currency = instr["shortTitle"] if instr else "RUB"
+            currency = acct_currencies.get(acct_id, "RUB")
 
         if key not in groups:
             groups[key] = {"income": 0, "outcome": 0, "count": 0, "currency": currency}
@@ -2140,18 +2635,12 @@ async def tool_get_analytics(args: dict) -> str:
         g["outcome"] += tx.get("outcome", 0)
         g["count"] += 1
 
+    # totals and the output rows in one pass over the groups
     grand_total = 0.0
-    for g in groups.values():
-        if an_type == "expense":
-            grand_total += g["outcome"]
-        elif an_type == "income":
-            grand_total += g["income"]
-        else:
-            grand_total += g["income"] + g["outcome"]
-
     groups_list = []
     for name, data in groups.items():
         total_val = data["outcome"] if an_type == "expense" else data["income"] if an_type == "income" else data["income"] + data["outcome"]
+        grand_total += total_val
         entry: dict[str, Any] = {"name": name, "total": total_val, "count": data["count"], "currency": data["currency"]}
         if an_type == "all":
             entry["income"] = data["income"]
@@ -2159,20 +2648,20 @@ async def tool_get_analytics(args: dict) -> str:
         groups_list.append(entry)
     groups_list.sort(key=lambda x: x["total"], reverse=True)
 
-    return json.dumps({
+    return _dumps({
         "period": {"from": start_date, "to": end_date},
         "type": an_type,
         "groupBy": group_by,
         "grandTotal": grand_total,
         "transactionCount": len(filtered),
         "groups": groups_list,
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_suggest(args: dict) -> str:
     payee = args["payee"]
     result = await _api_post("/v8/suggest/", {"payee": payee})
-    return json.dumps(result, ensure_ascii=False)
+    return _dumps(result)
 
 
 async def tool_get_merchants(args: dict) -> str:
@@ -2182,7 +2671,7 @@ async def tool_get_merchants(args: dict) -> str:
     merchants = CACHE.merchants()
     if search:
         q = search.lower()
-        merchants = [m for m in merchants if q in m.get("title", "").lower()]
+        merchants = [m for title, m in CACHE.merchants_with_lower_titles() if q in title]
     total = len(merchants)
     eff_limit = min(limit, 200)
     limited = merchants[offset:offset + eff_limit]
@@ -2193,16 +2682,16 @@ async def tool_get_merchants(args: dict) -> str:
         result["total"] = total
         result["showing"] = len(limited)
         result["offset"] = offset
-    return json.dumps(result, ensure_ascii=False)
+    return _dumps(result)
 
 
 async def tool_check_auth_status(args: dict) -> str:
     try:
         await _sync()
-        return json.dumps({"status": "authenticated", "message": "Token is valid and working"}, ensure_ascii=False)
+        return _dumps({"status": "authenticated", "message": "Token is valid and working"})
     except Exception as e:
         msg = str(e)
-        return json.dumps({
+        return _dumps({
             "status": "error",
             "error": msg,
             "solution": (
@@ -2210,7 +2699,7 @@ async def tool_check_auth_status(args: dict) -> str:
                 if "401" in msg or "expired" in msg.lower()
                 else "Check your credentials or network connection"
             ),
-        }, ensure_ascii=False)
+        })
 
 
 # -- Write tools --
@@ -2221,7 +2710,8 @@ async def tool_create_transaction(args: dict) -> str:
     account_id = args["account_id"]
     to_account_id = _g("to_account_id", args)
     category_ids = _g("category_ids", args)
-    date = _g("date", args) or _today()
+    date_arg = _g("date", args)
+    date = date_arg or _today()
     payee = _g("payee", args)
     comment = _g("comment", args)
     currency_id = _g("currency_id", args)
@@ -2231,9 +2721,8 @@ async def tool_create_transaction(args: dict) -> str:
     if to_account_id:
         _validate_uuid(to_account_id, "to_account_id")
     if category_ids:
-        for i, cid in enumerate(category_ids):
-            _validate_uuid(cid, f"category_ids[{i}]")
-    if _g("date", args):
+        _validate_uuid_list(category_ids, "category_ids[{}]")
+    if date_arg:
         _validate_date(date, "date")
     if currency_id is not None:
         currency_id = int(currency_id)
@@ -2276,7 +2765,7 @@ async def tool_create_transaction(args: dict) -> str:
 
     await _write_diff({"transaction": [tx]})
     created = CACHE.get("transaction", tx["id"]) or tx
-    return json.dumps({"created": _fmt_transaction(created)}, ensure_ascii=False)
+    return _dumps({"created": _fmt_transaction(created)})
 
 
 async def tool_update_transaction(args: dict) -> str:
@@ -2285,14 +2774,14 @@ async def tool_update_transaction(args: dict) -> str:
     if _g("date", args):
         _validate_date(args["date"], "date")
     if _g("category_ids", args):
-        for i, cid in enumerate(args["category_ids"]):
-            _validate_uuid(cid, f"category_ids[{i}]")
+        _validate_uuid_list(args["category_ids"], "category_ids[{}]")
 
     existing = CACHE.get("transaction", tid)
     if not existing:
         raise ValueError(f"Transaction not found: {tid}")
 
-    updated = {**existing, "changed": _now_ts()}
+    updated = existing.copy()
+    updated["changed"] = _now_ts()
     amount = _g("amount", args)
     if amount is not None:
         amount = float(amount)
@@ -2318,7 +2807,7 @@ async def tool_update_transaction(args: dict) -> str:
 
     await _write_diff({"transaction": [updated]})
     result = CACHE.get("transaction", tid) or updated
-    return json.dumps({"updated": _fmt_transaction(result)}, ensure_ascii=False)
+    return _dumps({"updated": _fmt_transaction(result)})
 
 
 async def tool_delete_transaction(args: dict) -> str:
@@ -2329,13 +2818,14 @@ async def tool_delete_transaction(args: dict) -> str:
     if not existing:
         raise ValueError(f"Transaction not found: {tid}")
 
-    deleted = {**existing, "deleted": True, "changed": _now_ts()}
+    deleted = existing.copy()
+    deleted.update(deleted=True, changed=_now_ts())
     await _write_diff({"transaction": [deleted]})
-    return json.dumps({
+    return _dumps({
         "deleted": True, "id": tid,
         "date": existing.get("date"),
         "amount": existing.get("outcome") or existing.get("income"),
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_create_account(args: dict) -> str:
@@ -2383,7 +2873,7 @@ async def tool_create_account(args: dict) -> str:
 
     await _write_diff({"account": [new_account]})
     created = CACHE.get_account(new_account["id"]) or new_account
-    return json.dumps({"created": _fmt_account(created)}, ensure_ascii=False)
+    return _dumps({"created": _fmt_account(created)})
 
 
 async def tool_create_budget(args: dict) -> str:
@@ -2424,14 +2914,14 @@ async def tool_create_budget(args: dict) -> str:
     cat_name = "ALL (aggregate)" if category_id == "00000000-0000-0000-0000-000000000000" else (
         (CACHE.get_tag(category_id) or {}).get("title", category)
     )
-    return json.dumps({
+    return _dumps({
         "success": True,
         "budget": {
             "month": month, "category": cat_name, "category_id": category_id,
             "income": income, "outcome": outcome,
             "income_lock": income_lock, "outcome_lock": outcome_lock,
         },
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_update_budget(args: dict) -> str:
@@ -2441,13 +2931,12 @@ async def tool_update_budget(args: dict) -> str:
 
     category_id = _find_category_id(category)
     month_date = f"{month}-01"
-    budget_key = f"{'null' if category_id == '00000000-0000-0000-0000-000000000000' else category_id}:{month_date}"
-
-    existing = CACHE.data["budget"].get(budget_key)
+    existing = CACHE.get_budget(category_id, month_date)
     if not existing:
         raise ValueError(f'Budget not found for category "{category}" in {month}. Use create_budget to create.')
 
-    updated = {**existing, "changed": _now_ts()}
+    updated = existing.copy()
+    updated["changed"] = _now_ts()
     if "income" in args:
         _validate_positive(float(args["income"]), "income")
         updated["income"] = float(args["income"])
@@ -2463,7 +2952,7 @@ async def tool_update_budget(args: dict) -> str:
     cat_name = "ALL (aggregate)" if category_id == "00000000-0000-0000-0000-000000000000" else (
         (CACHE.get_tag(category_id) or {}).get("title", category)
     )
-    return json.dumps({
+    return _dumps({
         "success": True, "message": "Budget updated",
         "budget": {
             "month": month, "category": cat_name,
@@ -2471,7 +2960,7 @@ async def tool_update_budget(args: dict) -> str:
             "income_lock": updated.get("incomeLock", False),
             "outcome_lock": updated.get("outcomeLock", False),
         },
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_delete_budget(args: dict) -> str:
@@ -2481,18 +2970,17 @@ async def tool_delete_budget(args: dict) -> str:
 
     category_id = _find_category_id(category)
     month_date = f"{month}-01"
-    budget_key = f"{'null' if category_id == '00000000-0000-0000-0000-000000000000' else category_id}:{month_date}"
-
-    existing = CACHE.data["budget"].get(budget_key)
+    existing = CACHE.get_budget(category_id, month_date)
     if not existing:
         raise ValueError(f'Budget not found for category "{category}" in {month}.')
 
-    deleted = {**existing, "changed": _now_ts(), "income": 0, "outcome": 0}
+    deleted = existing.copy()
+    deleted.update(changed=_now_ts(), income=0, outcome=0)
     await _write_diff({"budget": [deleted]})
     cat_name = "ALL (aggregate)" if category_id == "00000000-0000-0000-0000-000000000000" else (
         (CACHE.get_tag(category_id) or {}).get("title", category)
     )
-    return json.dumps({"success": True, "message": "Budget deleted", "category": cat_name, "month": month}, ensure_ascii=False)
+    return _dumps({"success": True, "message": "Budget deleted", "category": cat_name, "month": month})
 
 
 async def tool_create_reminder(args: dict) -> str:
@@ -2506,7 +2994,8 @@ async def tool_create_reminder(args: dict) -> str:
     interval = args["interval"]
     step = int(_g("step", args, 1))
     points = _g("points", args)
-    start_date = _g("start_date", args) or _today()
+    start_date_arg = _g("start_date", args)
+    start_date = start_date_arg or _today()
     end_date = _g("end_date", args)
     notify = bool(_g("notify", args, True))
     generate_markers = int(_g("generate_markers", args, 12))
@@ -2515,10 +3004,9 @@ async def tool_create_reminder(args: dict) -> str:
     if to_account_id:
         _validate_uuid(to_account_id, "to_account_id")
     if category_ids:
-        for cid in category_ids:
-            _validate_uuid(cid, "category_id")
+        _validate_uuid_list(category_ids, "category_id")
     _validate_positive(amount, "amount")
-    if _g("start_date", args):
+    if start_date_arg:
         _validate_date(start_date, "start_date")
     if end_date:
         _validate_date(end_date, "end_date")
@@ -2569,9 +3057,9 @@ async def tool_create_reminder(args: dict) -> str:
         dates = _generate_marker_dates(
             start_date, interval, step, points, end_date, generate_markers
         )
-        for date_str in dates:
+        for marker_id, date_str in zip(_new_uuid_batch(len(dates)), dates):
             marker = {
-                "id": _new_uuid(),
+                "id": marker_id,
                 "user": user_id,
                 "changed": now,
                 "incomeInstrument": reminder["incomeInstrument"],
@@ -2592,12 +3080,11 @@ async def tool_create_reminder(args: dict) -> str:
             markers.append(marker)
 
     # Send reminder + markers in one request
-    diff_data = {"reminder": [reminder]}
+    batch = WriteBatch().add("reminder", reminder)
     if markers:
-        diff_data["reminderMarker"] = markers
-
-    await _write_diff(diff_data)
-    return json.dumps({
+        batch.add("reminderMarker", *markers)
+    await batch.commit()
+    return _dumps({
         "success": True,
         "reminder": {
             "id": reminder["id"], "type": tx_type, "amount": amount,
@@ -2609,7 +3096,7 @@ async def tool_create_reminder(args: dict) -> str:
             "points": points or "all",
         },
         "markers_generated": len(markers),
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_update_reminder(args: dict) -> str:
@@ -2618,8 +3105,7 @@ async def tool_update_reminder(args: dict) -> str:
     if _g("amount", args):
         _validate_positive(float(args["amount"]), "amount")
     if _g("category_ids", args):
-        for cid in args["category_ids"]:
-            _validate_uuid(cid, "category_id")
+        _validate_uuid_list(args["category_ids"], "category_id")
     if _g("end_date", args):
         _validate_date(args["end_date"], "end_date")
 
@@ -2632,7 +3118,8 @@ async def tool_update_reminder(args: dict) -> str:
             if not CACHE.get_tag(cid):
                 raise ValueError(f"Category not found: {cid}")
 
-    updated = {**existing, "changed": _now_ts()}
+    updated = existing.copy()
+    updated["changed"] = _now_ts()
 
     if "amount" in args:
         amount = float(args["amount"])
@@ -2664,7 +3151,7 @@ async def tool_update_reminder(args: dict) -> str:
         updated["notify"] = bool(args["notify"])
 
     await _write_diff({"reminder": [updated]})
-    return json.dumps({"success": True, "message": "Reminder updated", "id": rid}, ensure_ascii=False)
+    return _dumps({"success": True, "message": "Reminder updated", "id": rid})
 
 
 async def tool_delete_reminder(args: dict) -> str:
@@ -2676,18 +3163,17 @@ async def tool_delete_reminder(args: dict) -> str:
         raise ValueError(f"Reminder not found: {rid}")
 
     now = _now_ts()
-    deletions: list[dict] = [{"id": rid, "object": "reminder", "stamp": now, "user": existing["user"]}]
-
-    for m in CACHE.reminder_markers():
-        if m.get("reminder") == rid:
-            deletions.append({"id": m["id"], "object": "reminderMarker", "stamp": now, "user": m["user"]})
+    batch = WriteBatch().delete("reminder", existing, now)
+    for m in CACHE.markers_by_reminder().get(rid, []):
+        batch.delete("reminderMarker", m, now)
 
-    await _write_diff({"deletion": deletions})
-    return json.dumps({
+    deletions = batch.changes["deletion"]
+    await batch.commit()
+    return _dumps({
         "success": True,
         "message": f"Reminder deleted with {len(deletions) - 1} associated markers",
         "id": rid,
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_create_reminder_marker(args: dict) -> str:
@@ -2706,8 +3192,7 @@ async def tool_create_reminder_marker(args: dict) -> str:
     if to_account_id:
         _validate_uuid(to_account_id, "to_account_id")
     if category_ids:
-        for cid in category_ids:
-            _validate_uuid(cid, "category_id")
+        _validate_uuid_list(category_ids, "category_id")
     if reminder_id:
         _validate_uuid(reminder_id, "reminder_id")
     _validate_date(date, "date")
@@ -2729,7 +3214,8 @@ async def tool_create_reminder_marker(args: dict) -> str:
     user_id = account.get("user")
     now = _now_ts()
 
-    # If no reminder_id, create a one-time Reminder
+    # If no reminder_id, create a one-time Reminder (sent together with the marker)
+    batch = WriteBatch()
     effective_reminder_id = reminder_id
     auto_created = False
     if not effective_reminder_id:
@@ -2754,7 +3240,7 @@ async def tool_create_reminder_marker(args: dict) -> str:
             "endDate": date,
             "notify": notify,
         }
-        await _write_diff({"reminder": [one_time]})
+        batch.add("reminder", one_time)
         effective_reminder_id = one_time["id"]
         auto_created = True
     else:
@@ -2781,8 +3267,8 @@ async def tool_create_reminder_marker(args: dict) -> str:
         "notify": notify,
     }
 
-    await _write_diff({"reminderMarker": [marker]})
-    return json.dumps({
+    await batch.add("reminderMarker", marker).commit()
+    return _dumps({
         "success": True,
         "reminder_marker": {
             "id": marker["id"], "type": tx_type, "amount": amount,
@@ -2792,7 +3278,7 @@ async def tool_create_reminder_marker(args: dict) -> str:
             "reminder_id": effective_reminder_id,
             "auto_created_reminder": auto_created,
         },
-    }, ensure_ascii=False)
+    })
 
 
 async def tool_delete_reminder_marker(args: dict) -> str:
@@ -2806,7 +3292,7 @@ async def tool_delete_reminder_marker(args: dict) -> str:
     await _write_diff({
         "deletion": [{"id": mid, "object": "reminderMarker", "stamp": _now_ts(), "user": marker["user"]}],
     })
-    return json.dumps({"success": True, "message": "ReminderMarker deleted", "id": mid}, ensure_ascii=False)
+    return _dumps({"success": True, "message": "ReminderMarker deleted", "id": mid})
 
 
 # ---------------------------------------------------------------------------
@@ -2840,6 +3326,14 @@ HANDLERS: dict[str, Any] = {
     "delete_reminder_marker": tool_delete_reminder_marker,
 }
 
+# Tools that only read the cache (suggest reads the API); these may reuse a
+# sync younger than ZENMONEY_SYNC_TTL. check_auth_status always syncs.
+_READ_ONLY_TOOLS = frozenset({
+    "get_accounts", "get_transactions", "get_categories", "get_instruments",
+    "get_budgets", "get_reminders", "analyze_budget_detailed", "get_analytics",
+    "suggest", "get_merchants",
+})
+
 
 # ---------------------------------------------------------------------------
 # Migration helpers
@@ -2857,7 +3351,7 @@ def _migrate_account_meta() -> None:
     config: dict[str, Any] = {}
     if _cfg_path.exists():
         try:
-            config = json.loads(_cfg_path.read_text(encoding="utf-8"))
+            config = dict(_load_json_file(_cfg_path))
         except Exception:
             pass
 
@@ -2869,7 +3363,8 @@ def _migrate_account_meta() -> None:
     try:
         account_meta = json.loads(old_path.read_text(encoding="utf-8"))
         config["accounts_meta"] = account_meta
-        _cfg_path.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding="utf-8")
+        _cfg_path.write_text(_dumps(config, pretty=True), encoding="utf-8")
+        _json_file_cache.pop(_cfg_path, None)
         print(f"Migrated account_meta.json to config.json", file=sys.stderr)
     except Exception as e:
         print(f"Warning: Failed to migrate account_meta.json: {e}", file=sys.stderr)
@@ -2879,46 +3374,179 @@ def _migrate_account_meta() -> None:
 # Main
 # ---------------------------------------------------------------------------
 
+def _run_async(coro: Any) -> Any:
+    """asyncio.run() on uvloop when the optional package is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        # asyncio.run() only takes loop_factory from 3.12; Runner has it from 3.11
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    uvloop.install()
+    return asyncio.run(coro)
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_list_json() -> str:
+    """--list output; TOOL_DOCS is static, so it is rendered once."""
+    tools = [{"name": n, "description": d["desc"]} for n, d in TOOL_DOCS.items()]
+    return json.dumps(tools, ensure_ascii=False, indent=2)
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_describe_json(name: str) -> str | None:
+    """--describe output for one tool, or None if it is unknown."""
+    doc = TOOL_DOCS.get(name)
+    if not doc:
+        return None
+    return json.dumps(
+        {"name": name, "description": doc["desc"], "parameters": doc["params"]},
+        ensure_ascii=False, indent=2,
+    )
+
+
+_NO_TOKEN_JSON = '{"error": "ZENMONEY_TOKEN not set. Set env var or add to config.json"}'
+
+
+@functools.lru_cache(maxsize=64)
+def _unknown_tool_json(name: str) -> str:
+    return json.dumps({"error": f"Unknown tool: {name}. Use --list to see available tools."})
+
+
 async def _run_tool(name: str, args: dict) -> str:
+    # resolve first: an unknown name needs no cache load or sync
+    handler = HANDLERS.get(name)
+    if handler is None:
+        return _unknown_tool_json(name)
     CACHE.load()
     _migrate_account_meta()
-    await _sync()
+    await _sync_unless_fresh((name,))
     try:
-        handler = HANDLERS.get(name)
-        if not handler:
-            return json.dumps({"error": f"Unknown tool: {name}. Use --list to see available tools."})
         return await handler(args)
     finally:
         await _close_client()
 
 
-def main() -> None:
+async def _run_tool_batch(calls: list[tuple[str, dict]]) -> tuple[str, bool]:
+    """Run several tools in order after a single load + sync.
+
+    Returns the JSON array of per-call results and whether any call failed.
+    Calls run sequentially so writes reach the server in the order given.
+    A repeated read-only call with the same arguments reuses the earlier
+    result until some other tool runs in between and may change the cache.
+    """
+    CACHE.load()
+    _migrate_account_meta()
+    await _sync_unless_fresh(name for name, _ in calls)
+    try:
+        parts = []
+        failed = False
+        done: dict[tuple[str, str], str] = {}
+        for name, args in calls:
+            handler = HANDLERS.get(name)
+            if name in _READ_ONLY_TOOLS:
+                key = (name, json.dumps(args, sort_keys=True))
+                if key in done:
+                    parts.append(done[key])
+                    continue
+            else:
+                key = None
+                done.clear()
+            try:
+                if not handler:
+                    raise ValueError(f"Unknown tool: {name}. Use --list to see available tools.")
+                result = await handler(args)
+            except Exception as e:
+                failed = True
+                parts.append(_dumps({"tool": name, "error": str(e)}))
+            else:
+                # handlers already return JSON text; splice it in unparsed
+                part = '{"tool":' + _dumps(name) + ',"result":' + result + "}"
+                parts.append(part)
+                if key is not None:
+                    done[key] = part
+        return "[" + ",".join(parts) + "]", failed
+    finally:
+        await _close_client()
+
+
+def _print_result(text: str) -> None:
+    """print() a tool result, encoding it to UTF-8 once straight into stdout's buffer."""
+    buf = getattr(sys.stdout, "buffer", None)
+    if buf is None:  # stdout replaced by a text-only stream
+        print(text)
+        return
+    sys.stdout.flush()
+    buf.write(text.encode("utf-8"))
+    buf.write(b"\n")
+    buf.flush()
+
+
+def _exit(code: int) -> None:
+    """End a --call run. The result is printed and the cache saved by now, so
+    skip interpreter teardown; failures only do so with ZENMONEY_FAST_EXIT=1,
+    so a normal SystemExit stays available when debugging.
+    """
+    if code and os.environ.get("ZENMONEY_FAST_EXIT") != "1":
+        sys.exit(code)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+
+def _parse_args(argv: list[str]) -> Any:
+    """Parse the command line.
+
+    The forms the skill actually sends (one mode flag, optionally --durable
+    first or last) are matched directly; anything else, including --help and
+    usage errors, goes through argparse.
+    """
+    opts, durable = argv, False
+    if opts[-1:] == ["--durable"]:
+        opts, durable = opts[:-1], True
+    elif opts[:1] == ["--durable"]:
+        opts, durable = opts[1:], True
+    parsed = SimpleNamespace(list=False, describe=None, call=None, call_batch=None, durable=durable)
+    if opts == ["--list"]:
+        parsed.list = True
+        return parsed
+    if len(opts) == 2 and opts[0] in ("--describe", "--call", "--call-batch") and not opts[1].startswith("-"):
+        setattr(parsed, opts[0][2:].replace("-", "_"), opts[1])
+        return parsed
+
+    import argparse
     parser = argparse.ArgumentParser(description="ZenMoney CLI executor")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--list", action="store_true", help="List all tools")
     group.add_argument("--describe", type=str, metavar="TOOL", help="Describe a tool")
     group.add_argument("--call", type=str, metavar="JSON", help='Call: {"tool":"name","arguments":{...}}')
-    parsed = parser.parse_args()
+    group.add_argument("--call-batch", type=str, metavar="JSON",
+                       help='Call several tools after one sync: [{"tool":"name","arguments":{...}}, ...]')
+    parser.add_argument("--durable", action="store_true", help="fsync the cache file before replacing it")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    parsed = _parse_args(sys.argv[1:])
+    CACHE.durable = parsed.durable
 
     if parsed.list:
-        tools = [{"name": n, "description": d["desc"]} for n, d in TOOL_DOCS.items()]
-        print(json.dumps(tools, ensure_ascii=False, indent=2))
+        print(_tool_list_json())
         return
 
     if parsed.describe:
-        doc = TOOL_DOCS.get(parsed.describe)
-        if not doc:
+        described = _tool_describe_json(parsed.describe)
+        if described is None:
             print(json.dumps({"error": f"Unknown tool: {parsed.describe}"}), file=sys.stderr)
             sys.exit(1)
-        print(json.dumps(
-            {"name": parsed.describe, "description": doc["desc"], "parameters": doc["params"]},
-            ensure_ascii=False, indent=2,
-        ))
+        print(described)
         return
 
     if parsed.call:
         if not TOKEN:
-            print(json.dumps({"error": "ZENMONEY_TOKEN not set. Set env var or add to config.json"}), file=sys.stderr)
+            print(_NO_TOKEN_JSON, file=sys.stderr)
             sys.exit(1)
 
         try:
@@ -2930,17 +3558,46 @@ def main() -> None:
         tool_name = payload.get("tool", "")
         arguments = payload.get("arguments", {})
 
-        if tool_name not in TOOL_DOCS:
-            print(json.dumps({"error": f"Unknown tool: {tool_name}. Use --list to see available tools."}), file=sys.stderr)
+        if tool_name not in HANDLERS:
+            print(_unknown_tool_json(tool_name), file=sys.stderr)
             sys.exit(1)
 
         try:
-            result = asyncio.run(_run_tool(tool_name, arguments))
-            print(result)
+            result = _run_async(_run_tool(tool_name, arguments))
+            _print_result(result)
         except Exception as e:
             print(json.dumps({"error": str(e)}), file=sys.stderr)
+            _exit(1)
+        _exit(0)
+
+    if parsed.call_batch:
+        if not TOKEN:
+            print(_NO_TOKEN_JSON, file=sys.stderr)
             sys.exit(1)
 
+        try:
+            payload = json.loads(parsed.call_batch)
+        except json.JSONDecodeError as e:
+            print(json.dumps({"error": f"Invalid JSON: {e}"}), file=sys.stderr)
+            sys.exit(1)
+        if not isinstance(payload, list) or not all(isinstance(c, dict) for c in payload):
+            print(json.dumps({"error": "--call-batch expects a JSON array of {\"tool\", \"arguments\"} objects"}), file=sys.stderr)
+            sys.exit(1)
+
+        calls = [(c.get("tool", ""), c.get("arguments", {})) for c in payload]
+        for tool_name, _ in calls:
+            if tool_name not in HANDLERS:
+                print(_unknown_tool_json(tool_name), file=sys.stderr)
+                sys.exit(1)
+
+        try:
+            result, failed = _run_async(_run_tool_batch(calls))
+        except Exception as e:
+            print(json.dumps({"error": str(e)}), file=sys.stderr)
+            _exit(1)
+        _print_result(result)
+        _exit(1 if failed else 0)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,56 @@
+"""Concurrent CLI processes saving .cache.json must not break each other."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+CLI = Path(__file__).resolve().parent.parent / "scripts" / "cli.py"
+
+# One CLI process: load cli.py with CACHE_PATH pointed at argv[1], then save argv[2] times
+WRITER = """
+import importlib.util, sys
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location("cli", sys.argv[3])
+cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cli)
+cli.CACHE_PATH = Path(sys.argv[1])
+
+cache = cli.Cache()
+cache.apply_diff({
+    "serverTimestamp": 1,
+    "account": [{"id": f"acc-{i}", "title": "x" * 200} for i in range(500)],
+})
+for _ in range(int(sys.argv[2])):
+    cache._dirty = True
+    cache.save()
+"""
+
+
+class ConcurrentSaveTest(unittest.TestCase):
+    def test_concurrent_saves_do_not_fail_or_tear(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / ".cache.json"
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, "-c", WRITER, str(cache_path), "100", str(CLI)],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                )
+                for _ in range(3)
+            ]
+            errors = [proc.communicate(timeout=120)[1] for proc in procs]
+            for proc, err in zip(procs, errors):
+                self.assertEqual(proc.returncode, 0, err)
+
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            self.assertEqual(data["serverTimestamp"], 1)
+            self.assertEqual(len(data["account"]), 500)
+            # every temp file was either swapped in or removed
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), [".cache.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()